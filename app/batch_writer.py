@@ -0,0 +1,242 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from .metrics import Histogram, LATENCY_BUCKETS, SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+class RotatingJSONLFile:
+    """
+    Fichero JSONL con rotación por tamaño (path, path.1, ..., path.N).
+
+    Solo se usa desde el hilo de escritura del JSONLWriter.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotations = 0
+        self._file = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+    def write(self, data: bytes):
+        if self._file is None:
+            self._open()
+        if self.max_bytes and self._file.tell() > 0 and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BatchWriter(abc.ABC):
+    """
+    Escritura asíncrona por lotes de registros dict hacia un destino bloqueante
+    (fichero, SQLite...).
+
+    `log` no bloquea nunca: aplica el muestreo (`sample_rate`) y deja el
+    registro en una cola acotada; con la cola llena el registro se descarta
+    y se cuenta. Una task de fondo agrupa hasta `batch_size` registros (o lo
+    que haya cada `flush_interval` segundos) y los escribe en un hilo propio,
+    así que ni el event loop ni el threadpool de FastAPI esperan al disco.
+
+    Las subclases implementan `_write_records` (y opcionalmente `_open_sink`
+    y `_close_sink`), que se ejecutan siempre en ese hilo.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self._executor: ThreadPoolExecutor | None = None
+        self._task: asyncio.Task | None = None
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self.write_latency = Histogram(LATENCY_BUCKETS)
+        self.accepted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def log(self, record: dict[str, Any]) -> bool:
+        """
+        Encola un registro. Devuelve False si se descartó (muestreo o cola llena).
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=type(self).__name__)
+            await self._in_writer_thread(self._open_sink)
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Escribe lo que quede en la cola y cierra el destino (apagado de la app).
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        while not self._queue.empty():
+            await self._write(self._take_batch())
+        await self._in_writer_thread(self._close_sink)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def flush(self):
+        """
+        Escribe ya lo que haya en la cola y espera al lote que esté escribiendo la task de fondo.
+        """
+        while not self._queue.empty():
+            await self._write(self._take_batch())
+        await self._queue.join()
+
+    async def _in_writer_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _take_batch(self, first: dict | None = None) -> list[dict]:
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            try:
+                if self._queue.qsize() < self.batch_size - 1:
+                    # Lote incompleto: se espera un poco para agrupar más registros
+                    await asyncio.sleep(self.flush_interval)
+            finally:
+                # También al cancelar (apagado): el registro ya sacado de la cola no se pierde
+                await self._write(self._take_batch(first))
+
+    async def _write(self, batch: list[dict]):
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            await self._in_writer_thread(self._write_records, batch)
+        except Exception:
+            self.write_errors += len(batch)
+            logger.exception("%s: error escribiendo %d registros", type(self).__name__, len(batch))
+            return
+        finally:
+            self.write_latency.observe(time.perf_counter() - start)
+            for _ in batch:
+                self._queue.task_done()
+        self.batch_sizes.observe(len(batch))
+        self.written += len(batch)
+
+    # ---------- Destino (se ejecuta en el hilo de escritura) ----------
+
+    def _open_sink(self):
+        pass
+
+    @abc.abstractmethod
+    def _write_records(self, batch: list[dict]):
+        ...
+
+    def _close_sink(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "queued": self.queued,
+            "max_queue": self._queue.maxsize,
+            "accepted": self.accepted,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "written": self.written,
+            "write_errors": self.write_errors,
+            "batch_size": self.batch_sizes.snapshot(),
+            "write_latency_seconds": self.write_latency.snapshot(),
+        }
+
+
+class JSONLWriter(BatchWriter):
+    """
+    Log estructurado asíncrono: registros dict -> líneas JSONL en un fichero con rotación.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+    ):
+        super().__init__(sample_rate, max_queue, batch_size, flush_interval)
+        self._file = RotatingJSONLFile(path, max_bytes=max_bytes, backup_count=backup_count)
+
+    def _write_records(self, batch: list[dict]):
+        # En el hilo de escritura: también la serialización sale del event loop
+        data = b"".join(
+            json.dumps(record, ensure_ascii=False, default=str).encode() + b"\n"
+            for record in batch
+        )
+        self._file.write(data)
+
+    def _close_sink(self):
+        self._file.close()
+
+    def stats(self) -> dict:
+        return {
+            "path": self._file.path,
+            "rotations": self._file.rotations,
+            **super().stats(),
+        }
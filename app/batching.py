@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Sequence
+from .metrics import Histogram, LATENCY_BUCKETS, SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# Recibe la lista de inputs del lote y devuelve un resultado (o excepción) por input, en el mismo orden
+BatchFn = Callable[[list[Any]], Awaitable[Sequence[Any]]]
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en lotes.
+
+    Cada `submit` espera como máximo `max_wait` segundos (o hasta completar
+    `max_batch_size`) y el lote se procesa con una sola llamada a `process_batch`.
+    Cada resultado vuelve a la corrutina que lo pidió.
+
+    Si quien llamó a `submit` se cancela (cliente desconectado, hedge perdedor),
+    su input sale del lote pendiente; si el lote ya está en curso y se cancelan
+    todos sus llamantes, se cancela también la llamada a `process_batch`.
+    """
+
+    def __init__(self, process_batch: BatchFn, max_batch_size: int = 16, max_wait: float = 0.005):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size debe ser mayor que 0")
+        self._process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[Any, asyncio.Future, float]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Encola un input y espera su resultado.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Aún sin enviar: se quita del lote para que no llegue al modelo
+            self._pending = [entry for entry in self._pending if entry[1] is not future]
+            if not self._pending and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            raise
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch))
+        # Guardamos referencia para que el GC no elimine la tarea y poder esperar en close()
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future, float]]):
+        now = time.perf_counter()
+        # Los que ya cancelaron (cliente desconectado) no se envían al modelo
+        live = [(item, future) for item, future, _ in batch if not future.done()]
+        for _, _, enqueued_at in batch:
+            self.queue_wait.observe(now - enqueued_at)
+        self.batch_sizes.observe(len(live))
+        if not live:
+            return
+
+        # Si todos los que esperan este lote se cancelan, se cancela la llamada en curso
+        task = asyncio.current_task()
+
+        def abandon(future: asyncio.Future):
+            if future.cancelled() and all(f.cancelled() for _, f in live):
+                task.cancel()
+
+        for _, future in live:
+            future.add_done_callback(abandon)
+        try:
+            results = await self._process_batch([item for item, _ in live])
+        except Exception as e:
+            logger.exception("Error procesando lote de %d items", len(live))
+            results = [e] * len(live)
+        finally:
+            for _, future in live:
+                future.remove_done_callback(abandon)
+
+        for (_, future), result in zip(live, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """
+        Procesa lo pendiente y espera a los lotes en curso (apagado de la app).
+        """
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_seconds": self.max_wait,
+            "pending": len(self._pending),
+            "inflight_batches": len(self._inflight),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+        }
+
+
+# Envía un lote de items; si lanza excepción se cuentan todos como fallidos
+SendFn = Callable[[list[Any]], Awaitable[Any]]
+
+
+class BufferedSender:
+    """
+    Envío agrupado "fire-and-forget" (notificaciones, eventos...).
+
+    `add` no espera: guarda el item en un buffer que se envía con una sola
+    llamada a `send_batch` al llegar a `max_batch_size` items o a los
+    `max_wait` segundos del primero. La memoria está acotada: con
+    `max_buffer` items pendientes los nuevos se descartan (y se cuentan), y
+    como mucho hay `max_inflight` lotes enviándose a la vez.
+    """
+
+    def __init__(
+        self,
+        send_batch: SendFn,
+        max_batch_size: int = 100,
+        max_wait: float = 1.0,
+        max_buffer: int = 10_000,
+        max_inflight: int = 4,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size debe ser mayor que 0")
+        self._send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_buffer = max(max_buffer, max_batch_size)
+        self.max_inflight = max_inflight
+        self._buffer: list[Any] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self._closing = False
+        self.batch_sizes = Histogram(SIZE_BUCKETS)
+        self.batch_latency = Histogram(LATENCY_BUCKETS)
+        self.accepted = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def add(self, item: Any) -> bool:
+        """
+        Añade un item al buffer. Devuelve False si se descartó por buffer lleno.
+        """
+        if self._closing or len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return False
+        self._buffer.append(item)
+        self.accepted += 1
+
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return True
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Con demasiados lotes en vuelo se sigue acumulando (hasta max_buffer); se reintenta al terminar uno
+        while self._buffer and len(self._inflight) < self.max_inflight:
+            batch = self._buffer[:self.max_batch_size]
+            del self._buffer[:self.max_batch_size]
+            task = asyncio.create_task(self._run(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        # Lo que se acumuló mientras tanto sale en cuanto hay hueco si ya forma un lote completo
+        if len(self._buffer) >= self.max_batch_size or (self._closing and self._buffer):
+            self._flush()
+        elif self._buffer and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _run(self, batch: list[Any]):
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        start = time.perf_counter()
+        try:
+            await self._send_batch(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Error enviando lote de %d items", len(batch))
+        else:
+            self.sent += len(batch)
+        finally:
+            self.batch_latency.observe(time.perf_counter() - start)
+
+    async def close(self):
+        """
+        Envía lo pendiente y espera a los lotes en curso (apagado de la app).
+        """
+        self._closing = True
+        self._flush()
+        while self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_seconds": self.max_wait,
+            "max_buffer": self.max_buffer,
+            "buffered": len(self._buffer),
+            "inflight_batches": len(self._inflight),
+            "accepted": self.accepted,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "batch_latency_seconds": self.batch_latency.snapshot(),
+        }
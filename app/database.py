@@ -0,0 +1,78 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import MetaData, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+
+class DatabaseConfig:
+    """Configuración de la base de datos SQL compartida (SQLAlchemy async)"""
+
+    URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///data/app.sqlite3")
+    POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    ECHO: bool = os.getenv("DB_ECHO", "False").lower() in ["true", "1", "yes"]
+
+db_config = DatabaseConfig()
+
+# Metadata común: cada lab declara aquí sus tablas
+metadata = MetaData()
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: las lecturas no esperan a las escrituras; busy_timeout evita "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class Database:
+    """
+    Engine async con pool de conexiones, uno por proceso (creado en el lifespan de la app).
+    """
+
+    def __init__(self, config: DatabaseConfig = db_config):
+        self.config = config
+        self._engine: AsyncEngine | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            raise RuntimeError("La base de datos no está inicializada (¿se ejecutó el lifespan de la app?)")
+        return self._engine
+
+    async def start(self):
+        if self._engine is not None:
+            return
+        url = self.config.URL
+        kwargs = {"echo": self.config.ECHO}
+        if url.startswith("sqlite"):
+            path = url.split("///", 1)[-1]
+            if path and path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if ":memory:" not in url:
+            kwargs.update(
+                pool_size=self.config.POOL_SIZE,
+                max_overflow=self.config.MAX_OVERFLOW,
+                pool_timeout=self.config.POOL_TIMEOUT,
+                pool_pre_ping=True,
+            )
+        self._engine = create_async_engine(url, **kwargs)
+        if url.startswith("sqlite"):
+            event.listen(self._engine.sync_engine, "connect", _sqlite_pragmas)
+
+        async with self._engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    async def close(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+
+database = Database()
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+# Recibe las claves únicas del lote y devuelve {clave: valor}; las que falten se resuelven a None
+BatchLoadFn = Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """
+    Agrupa las cargas individuales pedidas en el mismo tick del event loop.
+
+    Cada `load(key)` devuelve un future; al final del tick se hace una sola
+    llamada a `batch_load` con las claves únicas pedidas (p.ej. un
+    `WHERE id IN (...)`). Pensado para vivir lo que dura una request: también
+    memoriza los resultados ya cargados.
+    """
+
+    def __init__(self, batch_load: BatchLoadFn, max_batch_size: int = 1000):
+        self._batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._cache: dict[Hashable, asyncio.Future] = {}
+        self._queue: list[Hashable] = []
+        self._scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+
+    def load(self, key: Hashable) -> Awaitable[Any]:
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self):
+        self._scheduled = False
+        keys, self._queue = self._queue, []
+        for i in range(0, len(keys), self.max_batch_size):
+            task = asyncio.create_task(self._run(keys[i:i + self.max_batch_size]))
+            # Referencia para que el GC no elimine la tarea antes de terminar
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: list[Hashable]):
+        self.batches += 1
+        try:
+            values = await self._batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                # Un fallo no se memoriza: la siguiente carga lo reintenta
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(values.get(key))
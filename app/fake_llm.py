@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator
+from dotenv import load_dotenv
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, PrivateAttr
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+_ACTIONS = ("create_task", "update_task", "get_status", "other")
+_TODAY = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+
+class FakeLLMConfig:
+    """Configuración del backend LLM falso (pruebas de carga sin llamar a Gemini)"""
+
+    # fixed | uniform | exponential | lognormal
+    LATENCY_DIST: str = os.getenv("FAKE_LLM_LATENCY_DIST", "lognormal")
+    LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", 300))
+    # Dispersión: ancho del rango (uniform) o sigma del logaritmo (lognormal)
+    LATENCY_SPREAD: float = float(os.getenv("FAKE_LLM_LATENCY_SPREAD", 0.5))
+    FAILURE_RATE: float = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0))
+    SEED: int | None = int(os.getenv("FAKE_LLM_SEED")) if os.getenv("FAKE_LLM_SEED") else None
+
+fake_config = FakeLLMConfig()
+
+
+class FakeLLMError(RuntimeError):
+    """Fallo simulado del proveedor LLM."""
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model local y determinista con la misma interfaz que ChatGoogleGenerativeAI.
+
+    Responde con el JSON de intención que espera `intent_prompt`
+    (action, title, due_date), derivado de un hash del prompt: el mismo prompt
+    produce siempre la misma respuesta. La latencia y la tasa de fallos se
+    configuran con FAKE_LLM_* para simular al proveedor real.
+    """
+
+    model: str = "fake-llm"
+    temperature: float = 0.7
+    latency_dist: str = fake_config.LATENCY_DIST
+    latency_ms: float = fake_config.LATENCY_MS
+    latency_spread: float = fake_config.LATENCY_SPREAD
+    failure_rate: float = fake_config.FAILURE_RATE
+    seed: int | None = fake_config.SEED
+
+    _random: random.Random | None = PrivateAttr(default=None)
+
+    @property
+    def _rng(self) -> random.Random:
+        if self._random is None:
+            self._random = random.Random(self.seed)
+        return self._random
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    # ---------- Simulación ----------
+
+    def sample_latency(self) -> float:
+        """
+        Devuelve una latencia en segundos según la distribución configurada.
+        """
+        base = self.latency_ms / 1000
+        if self.latency_dist == "fixed":
+            return base
+        if self.latency_dist == "uniform":
+            return max(0.0, self._rng.uniform(base * (1 - self.latency_spread), base * (1 + self.latency_spread)))
+        if self.latency_dist == "exponential":
+            return self._rng.expovariate(1 / base) if base > 0 else 0.0
+        # lognormal: latency_ms es la mediana, cola larga a la derecha como un proveedor real
+        return self._rng.lognormvariate(0, self.latency_spread) * base
+
+    def _should_fail(self) -> bool:
+        return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+    def _respond(self, messages: list[BaseMessage]) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        today = _TODAY.search(prompt)
+        return json.dumps({
+            "action": _ACTIONS[int(digest[:2], 16) % len(_ACTIONS)],
+            "title": f"Tarea {digest[:6]}",
+            "due_date": today.group(1) if today and int(digest[2:4], 16) % 2 else None,
+        }, ensure_ascii=False)
+
+    # ---------- Interfaz BaseChatModel ----------
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.sample_latency())
+        if self._should_fail():
+            raise FakeLLMError("Fallo simulado del LLM")
+        return self._result(self._respond(messages))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.sample_latency())
+        if self._should_fail():
+            raise FakeLLMError("Fallo simulado del LLM")
+        return self._result(self._respond(messages))
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        result = self._generate(messages, stop, run_manager, **kwargs)
+        for piece in _chunks(result.generations[0].message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._respond(messages)
+        pieces = _chunks(content)
+        # La latencia se reparte entre los fragmentos para simular generación token a token
+        delay = self.sample_latency() / len(pieces)
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            if i == 0 and self._should_fail():
+                raise FakeLLMError("Fallo simulado del LLM")
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    def _result(self, content: str) -> ChatResult:
+        message = AIMessage(
+            content=content,
+            response_metadata={"model_name": self.model},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema: type[BaseModel], **kwargs: Any) -> Runnable:
+        """
+        Parsea el JSON generado y lo valida contra `schema` (equivale al structured output real).
+        """
+        return self | JsonOutputParser() | RunnableLambda(schema.model_validate)
+
+
+def _chunks(content: str, size: int = 8) -> list[str]:
+    return [content[i:i + size] for i in range(0, len(content), size)] or [""]
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class HedgePolicy:
+    """
+    Peticiones "hedged": si la llamada principal no ha terminado al llegar al
+    percentil `percentile` de las latencias recientes, se lanza una segunda
+    (normalmente a un modelo más rápido/barato). Gana la primera que termine
+    bien y la otra se cancela.
+
+    El presupuesto limita las llamadas extra: cada llamada suma `budget`
+    fichas (p.ej. 0.05 → como mucho un 5% de llamadas extra) y cada hedge
+    consume una.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_delay: float = 0.2,
+        min_samples: int = 20,
+        window: int = 500,
+        max_tokens: float = 10.0,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self._samples: deque[float] = deque(maxlen=window)
+        self._delay: float | None = None
+        self._since_recompute = 0
+        self._tokens = 0.0
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped_budget = 0
+
+    def hedge_delay(self) -> float | None:
+        """
+        Tiempo a esperar antes de lanzar el hedge, o None si aún no hay muestras suficientes.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._delay is None or self._since_recompute >= 20:
+            ordered = sorted(self._samples)
+            index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+            self._delay = max(self.min_delay, ordered[index])
+            self._since_recompute = 0
+        return self._delay
+
+    def _observe(self, latency: float):
+        self._samples.append(latency)
+        self._since_recompute += 1
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[Any]],
+        hedge: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Ejecuta `primary()` y, si se retrasa, también `hedge()`; devuelve el primer resultado correcto.
+        """
+        self.calls += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+        delay = self.hedge_delay() if self.enabled else None
+
+        start = time.perf_counter()
+        primary_task = asyncio.create_task(primary())
+        tasks = {primary_task}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.hedges_fired += 1
+                        tasks.add(asyncio.create_task(hedge()))
+                    else:
+                        self.hedges_skipped_budget += 1
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        # Si gana el hedge, lo que lleva la principal es una cota inferior de su
+                        # latencia: sin esas muestras lentas el percentil bajaría y se harían más hedges
+                        self._observe(time.perf_counter() - start)
+                        if task is not primary_task:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = error or task.exception()
+            # Fallaron todas: se propaga el error de la primera que terminó
+            raise error
+        finally:
+            # La perdedora (o todas, si el llamante se canceló) deja de consumir
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "budget": self.budget,
+            "hedge_delay_seconds": self._delay,
+            "samples": len(self._samples),
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped_budget": self.hedges_skipped_budget,
+            "hedge_rate": round(self.hedges_fired / self.calls, 4) if self.calls else 0.0,
+        }
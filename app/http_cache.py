@@ -0,0 +1,134 @@
+import time
+from typing import Any, Callable
+import httpx
+from .cache import TTLCache
+from .singleflight import SingleFlight
+
+
+class CachedResponse:
+    """
+    Respuesta 200 guardada junto con sus validadores (ETag / Last-Modified).
+    """
+
+    __slots__ = ("status_code", "headers", "content", "etag", "last_modified", "fresh_until")
+
+    def __init__(self, response: httpx.Response, fresh_until: float):
+        self.status_code = response.status_code
+        # El cuerpo se guarda ya descomprimido: sin estas cabeceras httpx no lo vuelve a decodificar
+        self.headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        self.content = response.content
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.fresh_until = fresh_until
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+        )
+
+
+class HTTPCache:
+    """
+    Cache de GETs salientes con peticiones condicionales.
+
+    - Mientras una entrada está fresca (`ttl`) se sirve sin llamar al upstream.
+    - Cuando caduca pero aún se conserva (`stale_ttl`), se revalida con
+      If-None-Match / If-Modified-Since: un 304 cuenta como hit y renueva la
+      frescura sin descargar el cuerpo (en GitHub, además, no consume rate limit).
+    - Las entradas se guardan en un TTLCache (LRU + expiración) y los GETs
+      concurrentes a la misma URL se coalescen con SingleFlight.
+
+    Solo se guardan respuestas 200; el resto se devuelve tal cual.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl: float = 60.0,
+        stale_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = TTLCache(max_size=max_size, ttl=max(ttl, stale_ttl), clock=clock)
+        self._singleflight = SingleFlight()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.rate_limit_remaining: int | None = None
+
+    async def get(self, client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        GET a través de la cache. Acepta los mismos kwargs que `client.get`.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        request = client.build_request("GET", url, params=kwargs.pop("params", None), headers=headers)
+        key = str(request.url)
+
+        entry: CachedResponse | None = self._entries.get(key, count=False)
+        if entry is not None and entry.fresh_until > self._clock():
+            self.hits += 1
+            return entry.to_response(request)
+
+        return await self._singleflight.do(key, lambda: self._fetch(client, request, headers, entry, kwargs))
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        request: httpx.Request,
+        headers: dict,
+        entry: CachedResponse | None,
+        kwargs: dict,
+    ) -> httpx.Response:
+        key = str(request.url)
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        self.upstream_calls += 1
+        response = await client.get(request.url, headers=headers, **kwargs)
+        remaining = response.headers.get("x-ratelimit-remaining")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            entry.fresh_until = self._clock() + self.ttl
+            self._entries.set(key, entry)
+            return entry.to_response(request)
+
+        self.misses += 1
+        if response.status_code == 200:
+            await response.aread()
+            self._entries.set(key, CachedResponse(response, self._clock() + self.ttl))
+        return response
+
+    def invalidate(self, url: str) -> bool:
+        return self._entries.invalidate(str(httpx.URL(url)))
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "revalidated_304": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "coalesced_calls": self._singleflight.saved,
+            "evictions": self._entries.evictions,
+            "rate_limit_remaining": self.rate_limit_remaining,
+        }
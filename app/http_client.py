@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import httpx
+from dotenv import load_dotenv
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientConfig:
+    """Configuración del cliente HTTP compartido para llamadas salientes"""
+
+    MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+    HTTP2: bool = os.getenv("HTTP_HTTP2", "False").lower() in ["true", "1", "yes"]
+    TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", 10))
+    CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+    # Timeout total por host, en JSON: {"api.github.com": 10}
+    HOST_TIMEOUTS: dict[str, float] = json.loads(os.getenv(
+        "HTTP_HOST_TIMEOUTS",
+        '{"api.github.com": 10, "jsonplaceholder.typicode.com": 10}',
+    ))
+
+http_config = HTTPClientConfig()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(config: HTTPClientConfig = http_config, **kwargs) -> httpx.AsyncClient:
+    """
+    Crea un httpx.AsyncClient con pool de conexiones y keep-alive.
+
+    Reutilizar el mismo cliente evita repetir el handshake TCP+TLS en cada
+    llamada. HTTP/2 solo se activa si está instalado el paquete `h2`
+    (`pip install httpx[http2]`).
+    """
+    default_timeout = httpx.Timeout(config.TIMEOUT, connect=config.CONNECT_TIMEOUT)
+    host_timeouts = {
+        host: httpx.Timeout(timeout, connect=min(timeout, config.CONNECT_TIMEOUT)).as_dict()
+        for host, timeout in config.HOST_TIMEOUTS.items()
+    }
+
+    async def apply_host_timeout(request: httpx.Request):
+        # Solo si la llamada no indicó su propio timeout (sigue el del cliente)
+        timeout = host_timeouts.get(request.url.host)
+        if timeout is not None and request.extensions.get("timeout") == default_timeout.as_dict():
+            request.extensions["timeout"] = timeout
+
+    http2 = config.HTTP2 and _http2_available()
+    if config.HTTP2 and not http2:
+        logger.warning("HTTP/2 solicitado pero 'h2' no está instalado; se usa HTTP/1.1")
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.KEEPALIVE_EXPIRY,
+        ),
+        timeout=default_timeout,
+        http2=http2,
+        event_hooks={"request": [apply_host_timeout]},
+        **kwargs,
+    )
+
+
+# =============================
+# Cliente compartido por la app (creado en el lifespan)
+# =============================
+
+_http_client: httpx.AsyncClient | None = None
+
+
+async def start_http_client():
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+
+
+async def close_http_client():
+    """
+    Cierra el pool de conexiones al apagar la app.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Dependency: devuelve el cliente HTTP compartido.
+    """
+    if _http_client is None:
+        raise RuntimeError("El cliente HTTP no está inicializado (¿se ejecutó el lifespan de la app?)")
+    return _http_client
@@ -0,0 +1,379 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class JobsConfig:
+    """Configuración de la cola de trabajos en segundo plano"""
+
+    DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs.sqlite3")
+    WORKERS: int = int(os.getenv("JOBS_WORKERS", 4))
+    MAX_QUEUE: int = int(os.getenv("JOBS_MAX_QUEUE", 1000))
+    MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))
+    BACKOFF_SECONDS: float = float(os.getenv("JOBS_BACKOFF_SECONDS", 1))
+    BACKOFF_MAX_SECONDS: float = float(os.getenv("JOBS_BACKOFF_MAX_SECONDS", 60))
+    DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("JOBS_DRAIN_TIMEOUT_SECONDS", 10))
+    # Los trabajos terminados (done/failed) se borran pasado este tiempo; se barre cada SWEEP_INTERVAL
+    RETENTION_HOURS: float = float(os.getenv("JOBS_RETENTION_HOURS", 24))
+    SWEEP_INTERVAL_SECONDS: float = float(os.getenv("JOBS_SWEEP_INTERVAL_SECONDS", 300))
+
+jobs_config = JobsConfig()
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class JobStore:
+    """
+    Persistencia de los trabajos en SQLite.
+
+    sqlite3 es bloqueante, así que cada operación se ejecuta en un hilo
+    (`asyncio.to_thread`) sobre una única conexión protegida con un lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        # (status, updated_at): sirve al conteo por estado y al borrado de terminados antiguos
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs (status, updated_at)")
+        self._conn = conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def open(self):
+        await asyncio.to_thread(self._open)
+
+    def _close(self):
+        # Con el lock: un barrido cancelado puede seguir ejecutándose en su hilo
+        with self._lock:
+            self._conn.close()
+
+    async def close(self):
+        if self._conn is not None:
+            await asyncio.to_thread(self._close)
+            self._conn = None
+
+    async def execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+
+class JobQueue:
+    """
+    Cola de trabajos en proceso: pool de workers asyncio + persistencia SQLite.
+
+    - Los handlers se registran por nombre con `@job_queue.handler("nombre")` y
+      reciben los kwargs (serializables a JSON) con los que se encoló el trabajo.
+    - `enqueue` responde 429 si ya hay `max_queue` trabajos pendientes
+      (backpressure) y 503 mientras la app se está apagando.
+    - Si un handler falla se reintenta con backoff exponencial (con jitter)
+      hasta `max_attempts`; después queda en estado `failed`.
+    - Al apagar se deja de tomar trabajos nuevos y se espera a los que están
+      en curso; los pendientes siguen en SQLite y se retoman al arrancar.
+    - Los trabajos terminados (done/failed) se consultan en GET /jobs/{id}
+      durante `retention` segundos; después una task de barrido los borra
+      para que la tabla no crezca sin límite.
+    """
+
+    def __init__(
+        self,
+        db_path: str = jobs_config.DB_PATH,
+        workers: int = jobs_config.WORKERS,
+        max_queue: int = jobs_config.MAX_QUEUE,
+        max_attempts: int = jobs_config.MAX_ATTEMPTS,
+        backoff: float = jobs_config.BACKOFF_SECONDS,
+        backoff_max: float = jobs_config.BACKOFF_MAX_SECONDS,
+        retention: float = jobs_config.RETENTION_HOURS * 3600,
+        sweep_interval: float = jobs_config.SWEEP_INTERVAL_SECONDS,
+    ):
+        self.store = JobStore(db_path)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retention = retention
+        self.sweep_interval = sweep_interval
+        self._handlers: dict[str, JobHandler] = {}
+        self._queue: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._running: set[asyncio.Task] = set()
+        self._retry_timers: set[asyncio.TimerHandle] = set()
+        self._pending = 0
+        self._closing = False
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+        self.rejected = 0
+        self.swept = 0
+
+    def handler(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        Decorador que registra `fn` como handler de los trabajos `name`.
+        """
+        def register(fn: JobHandler) -> JobHandler:
+            self._handlers[name] = fn
+            return fn
+        return register
+
+    # ---------- Ciclo de vida ----------
+
+    async def start(self):
+        if self._queue is not None:
+            return
+        await self.store.open()
+        self._queue = asyncio.Queue()
+        self._closing = False
+
+        # Los trabajos que estaban en curso al apagar (o caerse) se vuelven a encolar
+        await self.store.execute(
+            "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+            (time.time(),),
+        )
+        rows = await self.store.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at")
+        for row in rows:
+            self._put(row["id"])
+        self.recovered += len(rows)
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._workers.append(asyncio.create_task(self._sweeper()))
+
+    async def close(self, drain_timeout: float = jobs_config.DRAIN_TIMEOUT_SECONDS):
+        """
+        Apagado ordenado: no acepta ni toma trabajos nuevos y espera a los que están en curso.
+        """
+        if self._queue is None:
+            return
+        self._closing = True
+        for timer in self._retry_timers:
+            timer.cancel()
+        self._retry_timers.clear()
+        for task in self._workers:
+            task.cancel()
+
+        if self._running:
+            _, still_running = await asyncio.wait(self._running, timeout=drain_timeout)
+            # Los que no terminan a tiempo quedan como 'running' y se retoman al arrancar
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._pending = 0
+        await self.store.close()
+
+    # ---------- API ----------
+
+    async def enqueue(self, name: str, **kwargs: Any) -> str:
+        """
+        Persiste un trabajo y lo encola. Devuelve su id.
+        """
+        if name not in self._handlers:
+            raise ValueError(f"No hay handler registrado para el trabajo '{name}'")
+        if self._queue is None or self._closing:
+            raise HTTPException(
+                status_code=503,
+                detail="La cola de trabajos no está disponible",
+                headers={"Retry-After": "5"},
+            )
+        if self._pending >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Demasiados trabajos pendientes",
+                headers={"Retry-After": "1"},
+            )
+
+        # Se reserva la plaza antes de escribir para que enqueues concurrentes no superen max_queue
+        self._pending += 1
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            await self.store.execute(
+                "INSERT INTO jobs (id, name, payload, status, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, name, json.dumps(kwargs, default=str), self.max_attempts, now, now),
+            )
+        except BaseException:
+            self._pending -= 1
+            raise
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> dict | None:
+        rows = await self.store.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    async def stats(self) -> dict:
+        counts = {}
+        if self._queue is not None:
+            rows = await self.store.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+            counts = {row["status"]: row["n"] for row in rows}
+        return {
+            "workers": self.workers if self._workers else 0,
+            "pending": self._pending,
+            "running": len(self._running),
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered,
+            "rejected_queue_full": self.rejected,
+            "retention_seconds": self.retention,
+            "swept": self.swept,
+            "by_status": counts,
+        }
+
+    # ---------- Ejecución ----------
+
+    def _put(self, job_id: str):
+        self._pending += 1
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._pending -= 1
+            # Se ejecuta en su propia task para que el apagado pueda esperarla sin cancelarla
+            task = asyncio.create_task(self._run(job_id))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Fallo de la propia cola (p.ej. SQLite); el worker sigue con el siguiente
+                logger.exception("Error ejecutando el trabajo %s", job_id)
+
+    async def sweep(self) -> int:
+        """
+        Borra los trabajos terminados (done/failed) hace más de `retention` segundos.
+        """
+        rows = await self.store.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ? RETURNING id",
+            (time.time() - self.retention,),
+        )
+        self.swept += len(rows)
+        return len(rows)
+
+    async def _sweeper(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Error borrando trabajos terminados")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _run(self, job_id: str):
+        rows = await self.store.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+            "WHERE id = ? AND status = 'queued' RETURNING name, payload, attempts, max_attempts",
+            (time.time(), job_id),
+        )
+        if not rows:
+            return
+        row = rows[0]
+        handler = self._handlers.get(row["name"])
+        try:
+            if handler is None:
+                raise LookupError(f"No hay handler registrado para el trabajo '{row['name']}'")
+            result = await handler(**json.loads(row["payload"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if row["attempts"] < row["max_attempts"] and handler is not None:
+                self.retried += 1
+                await self.store.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, updated_at = ? WHERE id = ?",
+                    (error, time.time(), job_id),
+                )
+                self._schedule_retry(job_id, row["attempts"])
+            else:
+                self.failed += 1
+                await self.store.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (error, time.time(), job_id),
+                )
+            return
+
+        self.completed += 1
+        await self.store.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (json.dumps(result, default=str), time.time(), job_id),
+        )
+
+    def _schedule_retry(self, job_id: str, attempts: int):
+        if self._closing:
+            # Queda 'queued' en SQLite y se retoma al arrancar
+            return
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+
+        def retry():
+            self._retry_timers.discard(timer)
+            if not self._closing and self._queue is not None:
+                self._put(job_id)
+
+        timer = asyncio.get_running_loop().call_later(delay, retry)
+        self._retry_timers.add(timer)
+
+
+# Cola compartida por la app (se arranca y se cierra en el lifespan)
+job_queue = JobQueue()
@@ -0,0 +1,279 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+from .schemas import P1Response
+
+# =============================
+# Clasificador local por reglas (fast-path)
+# Resuelve los mensajes sencillos sin llamar al LLM.
+# Trabaja sobre una copia del texto en minúsculas y sin tildes con la misma
+# longitud que el original, así las posiciones sirven para recortar el título.
+# =============================
+
+_FOLD = str.maketrans("áéíóúüàèìòùñç", "aeiouuaeiounc")
+
+_ACTIONS = {
+    "create_task": re.compile(
+        r"\b(crea|crear|creame|anade|anadir|agrega|agregar|apunta|apuntame|apuntar|"
+        r"registra|registrar|programa|programame|recuerdame|nueva tarea)\b"
+    ),
+    "update_task": re.compile(
+        r"\b(actualiza|actualizar|modifica|modificar|cambia|cambiar|mueve|mover|renombra|"
+        r"renombrar|marca|marcar|completa|completar|edita|editar|pospon|posponer|reprograma)\b"
+    ),
+    "get_status": re.compile(
+        r"\b(estado|como va|como van|que tareas|cuales son|lista|listar|muestrame|ensename|"
+        r"pendientes|progreso)\b"
+    ),
+}
+
+# Texto entre el verbo y el título: "una tarea llamada", "la tarea:", "un recordatorio de"...
+_TITLE_INTRO = re.compile(
+    r"\s*(?:me\s+)?(?:(?:una|la|el|un|nueva|otra)\s+)?(?:(?:tarea|recordatorio|nota)\b\s*)?"
+    r"(?:(?:llamada|llamado|titulada|titulado|que se llame|con (?:el )?titulo|de nombre|de)\b\s*)?:?\s*"
+)
+_TITLE_TAIL = re.compile(
+    r"(?:\s+|^)(?:para|el|la|antes del?|hasta el|como|a|en|con fecha|que vence|y|"
+    r"como (?:hech[ao]|completad[ao]|terminad[ao]|finalizad[ao]|pendiente))\s*$"
+)
+# "... tarea <título>": el título queda anclado por la palabra tarea
+_TASK_TITLE = re.compile(
+    r"\btarea\b\s*(?:(?:llamada|llamado|titulada|titulado|que se llame|con (?:el )?titulo|de nombre|de)\b\s*)?:?\s*"
+)
+# Lo que va detrás de "tarea" no es un título ("una tarea en Madrid", "una tarea para mañana")
+_NOT_A_TITLE = re.compile(
+    r"(?:en|para|a|al|con|el|la|los|las|del|por|sin|que|y|o|como|hasta|antes|desde|sobre)\b"
+)
+# Frases de campo o de estado entre el verbo y el título: "la fecha de", "como completada"
+_FIELD_PHRASE = re.compile(
+    r"(?:(?:la|el)\s+)?(?:fecha|titulo|nombre|estado|prioridad|descripcion)\s+(?:de|del)\s+(?:(?:la|el|los|las)\s+)?"
+    r"|como\s+(?:(?:hech|completad|terminad|finalizad)[ao]s?|pendientes?)\s+(?:(?:la|el)\s+)?"
+)
+# Cambios de título/nombre ("cambia el título de la tarea X a Y"): mejor que decida el LLM
+_RENAME = re.compile(r"\b(?:titulo|nombre|renombra|renombrar)\b")
+_QUOTED = re.compile(r"[\"“«'](.+?)[\"”»']")
+_TASK_REF = re.compile(r"\btarea\s+(?:llamada\s+|titulada\s+|de\s+)?(.+)")
+
+_WEEKDAYS = {
+    "lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3,
+    "viernes": 4, "sabado": 5, "domingo": 6,
+}
+_MONTHS = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+_NUMBERS = {"un": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5, "seis": 6, "siete": 7}
+
+_DATE_PATTERNS = [
+    ("offset", re.compile(r"\bpasado manana\b"), 2),
+    ("offset", re.compile(r"\bmanana\b"), 1),
+    ("offset", re.compile(r"\bhoy\b"), 0),
+    ("in_days", re.compile(r"\b(?:en|dentro de)\s+(\d{1,3}|un|una|dos|tres|cuatro|cinco|seis|siete)\s+dias?\b"), None),
+    ("weekday", re.compile(
+        r"\b(?:(este|esta|proximo|siguiente)\s+)?(lunes|martes|miercoles|jueves|viernes|sabado|domingo)"
+        r"(?:\s+(que viene|proximo))?\b"
+    ), None),
+    ("iso", re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), None),
+    ("numeric", re.compile(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b"), None),
+    ("text", re.compile(
+        r"\b(\d{1,2})\s+de\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|"
+        r"octubre|noviembre|diciembre)(?:\s+(?:de|del)\s+(\d{4}))?\b"
+    ), None),
+]
+
+# Expresiones de fecha que no sabemos resolver con seguridad → mejor que decida el LLM
+_VAGUE_DATE = re.compile(
+    r"\b(semana|mes|ano|finde|fin de semana|luego|pronto|proximamente|tarde|noche)\b"
+)
+# Restos de fecha que no ha resuelto ningún patrón (se buscan fuera de las fechas encontradas):
+# horas ("a las 9", "9:30", "10h"), rangos ("del 1 al 15") y días sueltos ("el 15")
+_UNPARSED_DATE = re.compile(
+    r"\b(?:a|sobre|hacia|desde|hasta) las?\s+\d|\b\d{1,2}:\d{2}\b|\b\d{1,2}\s*(?:h|hrs?|horas?|am|pm)\b"
+    r"|\b(?:del?|desde el|entre el)\s+\d{1,2}\s+(?:al?|hasta el|y el)\b"
+    r"|\b(?:el|del|al|dia|los|las)\s+\d{1,2}\b"
+)
+
+
+def _fold(text: str) -> str:
+    # Un carácter de salida por cada carácter de entrada para conservar posiciones
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text).translate(_FOLD)
+
+
+def _safe_date(year: int, month: int, day: int) -> date | None:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _resolve_date(kind: str, match: re.Match, offset: int | None, today: date) -> date | None:
+    if kind == "offset":
+        return today + timedelta(days=offset)
+    if kind == "in_days":
+        raw = match.group(1)
+        days = int(raw) if raw.isdigit() else _NUMBERS[raw]
+        return today + timedelta(days=days)
+    if kind == "weekday":
+        modifier, name = match.group(1), match.group(2)
+        delta = (_WEEKDAYS[name] - today.weekday()) % 7
+        # "este viernes" puede ser hoy; "el viernes" / "el próximo viernes" es el siguiente
+        if delta == 0 and modifier not in ("este", "esta"):
+            delta = 7
+        return today + timedelta(days=delta)
+    if kind == "iso":
+        return _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    if kind == "numeric":
+        day, month, year = int(match.group(1)), int(match.group(2)), match.group(3)
+        if year is None:
+            candidate = _safe_date(today.year, month, day)
+            # Sin año: si ya pasó este año, se entiende el próximo
+            if candidate and candidate < today:
+                candidate = _safe_date(today.year + 1, month, day)
+            return candidate
+        year = int(year)
+        return _safe_date(year + 2000 if year < 100 else year, month, day)
+    if kind == "text":
+        day, month, year = int(match.group(1)), _MONTHS[match.group(2)], match.group(3)
+        if year is None:
+            candidate = _safe_date(today.year, month, day)
+            if candidate and candidate < today:
+                candidate = _safe_date(today.year + 1, month, day)
+            return candidate
+        return _safe_date(int(year), month, day)
+    return None
+
+
+def _find_dates(folded: str, today: date) -> list[tuple[int, int, date | None]]:
+    """
+    Devuelve (inicio, fin, fecha) de cada expresión de fecha sin solapamientos.
+    """
+    found: list[tuple[int, int, date | None]] = []
+    for kind, pattern, offset in _DATE_PATTERNS:
+        for match in pattern.finditer(folded):
+            start, end = match.span()
+            if any(start < f_end and end > f_start for f_start, f_end, _ in found):
+                continue
+            found.append((start, end, _resolve_date(kind, match, offset, today)))
+    return sorted(found, key=lambda item: item[0])
+
+
+def _mask_dates(folded: str, dates: list[tuple[int, int, date | None]]) -> str:
+    """
+    Copia del texto con las fechas encontradas tapadas por espacios (misma longitud).
+    """
+    chars = list(folded)
+    for start, end, _ in dates:
+        chars[start:end] = " " * (end - start)
+    return "".join(chars)
+
+
+def _clean_title(title: str) -> str | None:
+    title = title.strip(" \t\n.,;:!¡?¿")
+    while True:
+        match = _TITLE_TAIL.search(_fold(title))
+        if not match:
+            break
+        title = title[:match.start()].rstrip(" \t\n.,;:")
+    return title or None
+
+
+def classify_intent(message: str, today: date | None = None) -> tuple[P1Response, float]:
+    """
+    Clasifica un mensaje en español con reglas deterministas.
+
+    Devuelve la respuesta estructurada y una confianza entre 0 y 1. Solo los
+    mensajes sencillos ("crea una tarea X para mañana", "¿cómo van mis tareas?")
+    alcanzan confianza alta; el resto debe resolverlo el LLM.
+
+    :param message: Mensaje del usuario.
+    :param today: Fecha de referencia para fechas relativas (por defecto hoy).
+    :return: tuple(P1Response, confianza)
+    """
+    today = today or date.today()
+    original = unicodedata.normalize("NFC", message).strip()
+    folded = _fold(original)
+
+    # --- Acción ---
+    matches = {
+        action: list(pattern.finditer(folded))
+        for action, pattern in _ACTIONS.items()
+    }
+    matched = [action for action, found in matches.items() if found]
+    if not matched and folded.endswith("?") and "tarea" in folded:
+        matched = ["get_status"]
+        matches["get_status"] = []
+
+    if len(matched) != 1:
+        return P1Response(action="other", title=None, due_date=None), 0.2 if not matched else 0.3
+
+    action = matched[0]
+    confidence = 0.55
+    # Varios verbos de la misma acción ("crea X y crea Y") → varias tareas en un mensaje
+    if len(matches[action]) > 1:
+        confidence -= 0.3
+
+    # --- Fechas ---
+    dates = _find_dates(folded, today)
+    resolved = {d for _, _, d in dates if d is not None}
+    due_date = None
+    if _UNPARSED_DATE.search(_mask_dates(folded, dates)):
+        # Horas, rangos o días sueltos que las reglas no resuelven: el título se
+        # los llevaría y la fecha quedaría mal o vacía
+        confidence -= 0.3
+    elif len(resolved) == 1 and all(d is not None for _, _, d in dates):
+        due_date = resolved.pop()
+        confidence += 0.15
+    elif dates:
+        # Fecha inválida o varias fechas distintas
+        confidence -= 0.3
+    elif _VAGUE_DATE.search(folded):
+        confidence -= 0.3
+    else:
+        confidence += 0.15
+
+    # --- Título ---
+    # Solo un título anclado (entre comillas o tras "tarea") da confianza alta;
+    # el texto suelto tras el verbo se devuelve, pero por debajo del umbral
+    title = None
+    quoted = _QUOTED.search(original)
+    if quoted:
+        title = quoted.group(1).strip() or None
+        if title:
+            confidence += 0.3
+    elif action in ("create_task", "update_task"):
+        ref = _TASK_TITLE.search(folded)
+        anchored = bool(ref) and not _NOT_A_TITLE.match(folded, ref.end())
+        if anchored:
+            start = ref.end()
+            if action == "update_task" and _RENAME.search(folded):
+                anchored = False
+        else:
+            verb_end = matches[action][0].end()
+            intro = _TITLE_INTRO.match(folded, verb_end)
+            start = intro.end() if intro else verb_end
+            while phrase := _FIELD_PHRASE.match(folded, start):
+                if not phrase.group():
+                    break
+                start = _TITLE_INTRO.match(folded, phrase.end()).end()
+        end = next((d_start for d_start, _, _ in dates if d_start >= start), len(original))
+        title = _clean_title(original[start:end])
+        if not title or len(title) > 120:
+            title = None
+        elif anchored:
+            confidence += 0.25
+        else:
+            confidence += 0.05
+    else:
+        # get_status: título solo si se menciona una tarea concreta
+        ref = _TASK_REF.search(folded)
+        if ref:
+            end = next((d_start for d_start, _, _ in dates if d_start >= ref.start(1)), len(original))
+            title = _clean_title(original[ref.start(1):end])
+        confidence += 0.25
+
+    result = P1Response(
+        action=action,
+        title=title,
+        due_date=due_date.strftime("%Y-%m-%d") if due_date else None,
+    )
+    return result, round(max(0.0, min(confidence, 1.0)), 2)
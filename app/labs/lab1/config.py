@@ -0,0 +1,54 @@
+import os
+from dotenv import load_dotenv
+from config_base import GOOGLE_LLM_HEDGE_MODEL
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+class Lab1Config:
+    """Configuración centralizada para Lab1"""
+
+    # Cache de intenciones (/query, /query-chain, /query-bg, /query-bg-external)
+    INTENT_CACHE_MAX_SIZE: int = int(os.getenv("INTENT_CACHE_MAX_SIZE", 1024))
+    INTENT_CACHE_TTL_SECONDS: float = float(os.getenv("INTENT_CACHE_TTL_SECONDS", 3600))
+
+    # Micro-batching de llamadas concurrentes al LLM (no se usa con INTENT_HEDGE_ENABLED: el hedge necesita poder cancelar la principal)
+    INTENT_BATCH_ENABLED: bool = os.getenv("INTENT_BATCH_ENABLED", "True").lower() in ["true", "1", "yes"]
+    INTENT_BATCH_MAX_SIZE: int = int(os.getenv("INTENT_BATCH_MAX_SIZE", 16))
+    INTENT_BATCH_WINDOW_MS: float = float(os.getenv("INTENT_BATCH_WINDOW_MS", 5))
+    INTENT_BATCH_MAX_CONCURRENCY: int = int(os.getenv("INTENT_BATCH_MAX_CONCURRENCY", 8))
+
+    # Fast-path: clasificador local por reglas antes de llamar al LLM
+    INTENT_FAST_PATH_ENABLED: bool = os.getenv("INTENT_FAST_PATH_ENABLED", "True").lower() in ["true", "1", "yes"]
+    INTENT_FAST_PATH_THRESHOLD: float = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", 0.8))
+
+    # Endpoint bulk /query-batch
+    INTENT_BULK_MAX_ITEMS: int = int(os.getenv("INTENT_BULK_MAX_ITEMS", 1000))
+    INTENT_BULK_MAX_CONCURRENCY: int = int(os.getenv("INTENT_BULK_MAX_CONCURRENCY", 8))
+
+    # Hedging: segunda llamada (a otro modelo) si la principal supera el percentil de latencia
+    INTENT_HEDGE_ENABLED: bool = os.getenv("INTENT_HEDGE_ENABLED", "False").lower() in ["true", "1", "yes"]
+    INTENT_HEDGE_MODEL: str = os.getenv("INTENT_HEDGE_MODEL", GOOGLE_LLM_HEDGE_MODEL)
+    INTENT_HEDGE_PERCENTILE: float = float(os.getenv("INTENT_HEDGE_PERCENTILE", 95))
+    INTENT_HEDGE_BUDGET: float = float(os.getenv("INTENT_HEDGE_BUDGET", 0.05))
+    INTENT_HEDGE_MIN_DELAY_MS: float = float(os.getenv("INTENT_HEDGE_MIN_DELAY_MS", 200))
+
+    # Cache HTTP condicional (ETag / Last-Modified) para la API de GitHub
+    GITHUB_CACHE_MAX_SIZE: int = int(os.getenv("GITHUB_CACHE_MAX_SIZE", 512))
+    GITHUB_CACHE_TTL_SECONDS: float = float(os.getenv("GITHUB_CACHE_TTL_SECONDS", 60))
+    GITHUB_CACHE_STALE_SECONDS: float = float(os.getenv("GITHUB_CACHE_STALE_SECONDS", 86400))
+
+    # Endpoint bulk /github-analyze-batch
+    REPO_BULK_MAX_ITEMS: int = int(os.getenv("REPO_BULK_MAX_ITEMS", 500))
+    REPO_BULK_MAX_CONCURRENCY: int = int(os.getenv("REPO_BULK_MAX_CONCURRENCY", 16))
+    REPO_BULK_PER_HOST_CONCURRENCY: int = int(os.getenv("REPO_BULK_PER_HOST_CONCURRENCY", 8))
+    REPO_BULK_HOST_DELAY_MS: float = float(os.getenv("REPO_BULK_HOST_DELAY_MS", 0))
+    REPO_BULK_TIMEOUT_SECONDS: float = float(os.getenv("REPO_BULK_TIMEOUT_SECONDS", 10))
+
+    # Notificaciones externas agrupadas (/query-bg-external)
+    NOTIFY_BATCH_MAX_SIZE: int = int(os.getenv("NOTIFY_BATCH_MAX_SIZE", 100))
+    NOTIFY_BATCH_WINDOW_MS: float = float(os.getenv("NOTIFY_BATCH_WINDOW_MS", 1000))
+    NOTIFY_BUFFER_MAX_ITEMS: int = int(os.getenv("NOTIFY_BUFFER_MAX_ITEMS", 10000))
+    NOTIFY_MAX_INFLIGHT_BATCHES: int = int(os.getenv("NOTIFY_MAX_INFLIGHT_BATCHES", 4))
+
+config = Lab1Config()
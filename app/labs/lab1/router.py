@@ -1,16 +1,51 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import Annotated
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 import asyncio
+from contextlib import aclosing
 import time
 import httpx
-from datetime import date, datetime
-from app.llm_client import llm_chain_google
-from .prompts import intent_prompt
-from .schemas import P1Request, P1Response, PostResponse1, RepoRequest, RepoResponse
+from datetime import datetime
+from .schemas import (
+    P1Request,
+    P1Response,
+    P1BatchRequest,
+    P1BatchResponse,
+    PostResponse1,
+    RepoRequest,
+    RepoResponse,
+    RepoBatchRequest,
+)
 from .utils import extract_owner_repo
+from .services import (
+    parse_intent_message,
+    stream_intent_message,
+    iter_intent_batch,
+    admit_intent_batch,
+    intent_cache,
+    intent_batchers,
+    intent_hedge,
+    fast_path_stats,
+    github_cache,
+    notification_sender,
+    add_notification,
+    iter_repo_batch,
+    repo_summary,
+)
+from .config import config
 from .constants import URL
+from app.sse import sse_response
+from app.http_client import get_http_client
+from app.jobs import job_queue
 
 router = APIRouter(prefix="/lab1", tags=["Lab1 - Llamadas externas async y Background Tasks"])
 
+# Cliente HTTP compartido (pool de conexiones creado en el lifespan de la app)
+HTTPClientDep = Annotated[
+    httpx.AsyncClient,
+    Depends(get_http_client)
+]
+
 # =============================
 # Llamadas a modelos llm
 # =============================
@@ -28,16 +63,13 @@ router = APIRouter(prefix="/lab1", tags=["Lab1 - Llamadas externas async y Backg
 )
 async def parse_intent(req: P1Request):
     try: 
-        today = date.today().strftime("%Y-%m-%d")
-        prompt = intent_prompt.format(user_message=req.message, today=today)
-
-        # Inicializar LLM con salida estructurada
-        llm = llm_chain_google().with_structured_output(P1Response)
-
-        # Ejecutar modelo
-        result: P1Response = await llm.ainvoke(prompt)
+        # Ejecutar modelo (con cache compartida por message normalizado + fecha)
+        result: P1Response = await parse_intent_message(req.message, route="/lab1/query")
 
         return result
+    except HTTPException:
+        # 429/503 del limitador de concurrencia
+        raise
     except Exception as e:
         return {"error": str(e)}
     
@@ -55,17 +87,120 @@ async def parse_intent(req: P1Request):
 )
 async def parse_intent(req: P1Request):
     try:
-        today = date.today().strftime("%Y-%m-%d")
-        llm = llm_chain_google().with_structured_output(P1Response)
-        chain = intent_prompt | llm
-    
-        result: P1Response = await chain.ainvoke({"user_message": req.message, "today": today})
+        result: P1Response = await parse_intent_message(req.message, use_chain=True, route="/lab1/query-chain")
         
         return result
+    except HTTPException:
+        # 429/503 del limitador de concurrencia
+        raise
     except Exception as e:
         return {"error": str(e)}
 
 
+@router.post(
+    "/query-stream",
+    summary="(Version streaming) Analiza la intención y emite el JSON parcial por SSE",
+    description="""
+    Igual que /query pero responde con Server-Sent-Events mientras el modelo genera.
+    Eventos: `partial` (JSON parcial acumulado), `result` (JSON final validado) y `error`.
+    Si el cliente se desconecta se cancela la generación en el modelo.
+    """,
+    response_description="Stream text/event-stream con el JSON parcial y el resultado final",
+)
+async def parse_intent_stream(req: P1Request):
+    async def events():
+        try:
+            async with aclosing(stream_intent_message(req.message, route="/lab1/query-stream")) as stream:
+                async for event in stream:
+                    yield event
+        except HTTPException as e:
+            yield "error", {"error": e.detail, "status_code": e.status_code, "headers": e.headers}
+        except Exception as e:
+            yield "error", {"error": str(e)}
+
+    return sse_response(events())
+
+
+@router.post(
+    "/query-batch",
+    summary="Analiza la intención de varios mensajes en una sola petición",
+    description="""
+    Recibe una lista de mensajes y los analiza con concurrencia limitada (`max_concurrency`, acotada por la configuración).
+    Devuelve los resultados en el mismo orden que la petición; si un mensaje falla se indica el error en su item sin abortar el resto.
+    Si el limitador de la ruta tiene la cola llena se rechaza la petición entera con 429 y Retry-After.
+    Con `stream=true` responde NDJSON (`application/x-ndjson`) emitiendo cada item en cuanto termina.
+    """,
+    response_description="Resultados por mensaje, en orden",
+    response_model=P1BatchResponse
+)
+async def parse_intent_batch(
+    req: P1BatchRequest,
+    stream: bool = Query(False, description="Emitir cada resultado como NDJSON en cuanto esté listo")
+):
+    if len(req.items) > config.INTENT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {config.INTENT_BULK_MAX_ITEMS} mensajes por petición"
+        )
+
+    # Se admite o se rechaza la petición entera; después sus items esperan hueco en el limitador
+    admit_intent_batch()
+
+    messages = [item.message for item in req.items]
+    max_concurrency = min(req.max_concurrency or config.INTENT_BULK_MAX_CONCURRENCY, config.INTENT_BULK_MAX_CONCURRENCY)
+
+    if stream:
+        async def lines():
+            async with aclosing(iter_intent_batch(messages, max_concurrency)) as items:
+                async for item in items:
+                    yield item.model_dump_json() + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    results = [None] * len(messages)
+    async with aclosing(iter_intent_batch(messages, max_concurrency)) as items:
+        async for item in items:
+            results[item.index] = item
+
+    return P1BatchResponse(results=results)
+
+
+@router.get(
+    "/intent-cache/stats",
+    summary="Estadísticas de la cache de intenciones",
+    description="Tamaño, hits, misses y evicciones de la cache compartida por las rutas de intención."
+)
+async def intent_cache_stats():
+    return intent_cache.stats()
+
+
+@router.get(
+    "/fast-path/stats",
+    summary="Tasa de aciertos del clasificador local por ruta",
+    description="Cuántas intenciones se resolvieron con reglas locales (sin LLM) en cada ruta."
+)
+async def intent_fast_path_stats():
+    return fast_path_stats()
+
+
+@router.get(
+    "/intent-hedge/stats",
+    summary="Estadísticas de peticiones hedged",
+    description="Cuántas veces se lanzó una segunda llamada al superar el percentil de latencia y cuántas ganó."
+)
+async def intent_hedge_stats():
+    return intent_hedge.stats()
+
+
+@router.get(
+    "/intent-batch/stats",
+    summary="Estadísticas del micro-batching de intenciones",
+    description="Histogramas de tamaño de lote y tiempo de espera en cola por cada batcher."
+)
+async def intent_batch_stats():
+    return {name: batcher.stats() for name, batcher in intent_batchers.items()}
+
+
 # =============================
 # Llamadas externas asincronas
 # llamadas a endpoints externos
@@ -76,15 +211,15 @@ async def parse_intent(req: P1Request):
     response_model=PostResponse1,
     summary="Obtiene un post desde JSONPlaceholder"
 )
-async def get_external_post():
+async def get_external_post(client: HTTPClientDep):
     try:
-        # Creamos un cliente HTTP asíncrono con timeout de 10 segundos
-        # El "async with" asegura que las conexiones se cierren correctamente
-        async with httpx.AsyncClient(timeout=10) as client:
-            
-            # Realizamos la petición GET de forma NO bloqueante
-            # Mientras espera respuesta, el event loop puede atender otras requests
-            response = await client.get(URL)
+        # Usamos el cliente HTTP compartido: reutiliza conexiones abiertas (keep-alive)
+        # en vez de abrir un cliente nuevo y repetir el handshake TCP+TLS en cada request.
+        # El timeout lo aplica la config por host (HTTP_HOST_TIMEOUTS).
+
+        # Realizamos la petición GET de forma NO bloqueante
+        # Mientras espera respuesta, el event loop puede atender otras requests
+        response = await client.get(URL)
 
         # Lanza excepción si el status HTTP es 4xx o 5xx
         # Ej: 404, 500, etc.
@@ -112,13 +247,20 @@ async def get_external_post():
         )
 
 # =============================
-# Background Tasks
-# Tarea que se ejecuta después de responder al usuario
+# Trabajos en segundo plano
+# Tareas que se ejecutan después de responder al usuario, en la cola de
+# trabajos de la app (app/jobs.py): persistidas en SQLite, con reintentos
+# y consultables en GET /jobs/{job_id}. La respuesta lleva el id en X-Job-Id.
 # =============================
 
+def _job_headers(response: Response, job_id: str):
+    response.headers["X-Job-Id"] = job_id
+    response.headers["Location"] = f"/jobs/{job_id}"
+
 # ejemplo 1
 
-async def log_intent_background(message: str, intent: str):
+@job_queue.handler("lab1.log_intent")
+async def log_intent_background(message: str, intent: str) -> dict:
     """
     Guarda un log de la intención detectada en una tarea de fondo.
     
@@ -127,10 +269,8 @@ async def log_intent_background(message: str, intent: str):
     :param intent: La intención detectada por el modelo de lenguaje.
     :type intent: str
     """
-    print(f"[BG] Guardando log de intención...")
     await asyncio.sleep(2)  # Simula guardado lento
-    print(f"[BG] Mensaje: {message}")
-    print(f"[BG] Intent detectado: {intent}")
+    return {"message": message, "intent": intent}
 
 @router.post(
     "/query-bg",
@@ -139,105 +279,67 @@ async def log_intent_background(message: str, intent: str):
 )
 async def parse_intent_background(
     req: P1Request,
-    background_tasks: BackgroundTasks
+    response: Response
 ):
     try:
-        today = date.today().strftime("%Y-%m-%d")
-        prompt = intent_prompt.format(user_message=req.message, today=today)
-
-        llm = llm_chain_google().with_structured_output(P1Response)
-
-        result: P1Response = await llm.ainvoke(prompt)
+        result: P1Response = await parse_intent_message(req.message, route="/lab1/query-bg")
 
-        # 👇 Tarea background (NO bloquea respuesta)
-        background_tasks.add_task(
-            log_intent_background,
-            req.message,
-            result.intent if hasattr(result, "intent") else "unknown"
+        # 👇 Trabajo en background (NO bloquea respuesta)
+        job_id = await job_queue.enqueue(
+            "lab1.log_intent",
+            message=req.message,
+            intent=result.action
         )
+        _job_headers(response, job_id)
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
 
 # ejemplo 2
 
-async def notify_external_service(intent: str):
-    """
-    Notifica a un servicio externo sobre la intención detectada.
-    
-    :param intent: La intención detectada que se enviará al servicio externo. Por ejemplo, "crear_tarea" o "actualizar_tarea".
-    :type intent: str 
-    """
-    try:
-        print("[BG] Notificación externa enviada")
-        async with httpx.AsyncClient(timeout=5) as client:
-            response = await client.post(
-                "https://jsonplaceholder.typicode.com/posts",
-                json={"intent": intent}
-            )
-            response.raise_for_status() # Raise an exception for bad status codes
-            data_from_external_service = response.json()
-            print(f"[BG] Respuesta del servicio externo (JSON): {data_from_external_service.get('intent', 'No intent found')}")
-    except Exception as e:
-        print(f"[BG] Error notificando: {e}")
- 
-        
 @router.post(
     "/query-bg-external", 
     response_model=P1Response,
     summary="Analiza intención y notifica a un servicio externo en background"
 )
-async def parse_intent_bg_external(
-    req: P1Request,
-    background_tasks: BackgroundTasks
-):
-    today = date.today().strftime("%Y-%m-%d")
-
-    llm = llm_chain_google().with_structured_output(P1Response)
-    result: P1Response = await llm.ainvoke(
-        intent_prompt.format(user_message=req.message, today=today)
-    )
+async def parse_intent_bg_external(req: P1Request, response: Response):
+    result: P1Response = await parse_intent_message(req.message, route="/lab1/query-bg-external")
 
-    background_tasks.add_task(
-        notify_external_service,
-        str(result)
-    )
+    # La notificación se acumula y cada lote se encola como un trabajo durable (un POST por lote)
+    queued = add_notification(str(result))
+    response.headers["X-Notification"] = "queued" if queued else "dropped"
 
     return result
 
+
+@router.get(
+    "/notifications/stats",
+    summary="Estadísticas del envío agrupado de notificaciones",
+    description="Items aceptados, encolados como trabajo (un lote por trabajo), fallidos y descartados, tamaño de lote y latencia por lote."
+)
+async def notifications_stats():
+    return notification_sender.stats()
+
 # ejemplo 3
 
-async def analize_repo_details(owner: str, repo: str):
+@job_queue.handler("lab1.analyze_repo")
+async def analize_repo_details(owner: str, repo: str, repo_data: dict) -> dict:
     """
     Analiza información de repositorio y genera un reporte en background.
+    Reutiliza los datos que ya obtuvo el handler en vez de volver a pedirlos a GitHub.
     """
-    print(f"[BG] Iniciando análisis de issues para {owner}/{repo}...")
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as cliente:
-            url_repo = f"https://api.github.com/repos/{owner}/{repo}"
-            resp = await cliente.get(url_repo)
-            resp.raise_for_status()
-            repo_data = resp.json()
-            
-            total_issues = repo_data.get('open_issues_count', 0)
-            description = repo_data.get('description', '')
-            visibility = repo_data.get('visibility', '')
-            
-            reporte = f"""
-                REPORTE DE ANÁLISIS
-                ===================
-                Repositorio: {owner}/{repo}
-                Total de issues abiertos: {total_issues}
-                Descripción: {description}
-                Visibilidad: {visibility}
-                Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
-            print(f"[BG] Análisis completado:\n{reporte}")
-    except Exception as e:
-        print(f"[BG ERROR] Error al analizar repo: {e}")
+    return {
+        "repository": f"{owner}/{repo}",
+        "open_issues": repo_data.get('open_issues_count', 0),
+        "description": repo_data.get('description', ''),
+        "visibility": repo_data.get('visibility', ''),
+        "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
 
 
 @router.post(
@@ -247,7 +349,8 @@ async def analize_repo_details(owner: str, repo: str):
 )
 async def analize_repository_github(
     req: RepoRequest,
-    background_tasks: BackgroundTasks
+    response: Response,
+    cliente: HTTPClientDep
 ):
     """
     Recibe URL de repositorio, devuelve info básica inmediatamente
@@ -256,28 +359,68 @@ async def analize_repository_github(
     try:
         owner, repo = extract_owner_repo(str(req.url))
 
-        async with httpx.AsyncClient(timeout=10.0) as cliente:
-            url_api = f"https://api.github.com/repos/{owner}/{repo}"
-            resp = await cliente.get(url_api)
-            resp.raise_for_status()
-            repo_data = resp.json()
+        url_api = f"https://api.github.com/repos/{owner}/{repo}"
+        resp = await github_cache.get(cliente, url_api, timeout=10.0)
+        resp.raise_for_status()
+        repo_data = resp.json()
 
         # Programar análisis en background
-        background_tasks.add_task(
-            analize_repo_details,
-            owner,
-            repo
+        job_id = await job_queue.enqueue(
+            "lab1.analyze_repo",
+            owner=owner,
+            repo=repo,
+            repo_data=repo_data
         )
+        _job_headers(response, job_id)
 
-        return RepoResponse(
-            name=repo_data["full_name"],
-            stars=repo_data["stargazers_count"],
-            lang=repo_data["language"] or "No especificado"
-        )
+        return repo_summary(repo_data)
 
+    except HTTPException:
+        raise
     except httpx.HTTPStatusError:
         raise HTTPException(status_code=404, detail="Repositorio no encontrado")
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="GitHub API no respondió a tiempo")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+
+
+@router.post(
+    "/github-analyze-batch",
+    summary="Analiza varios repositorios de GitHub en una sola petición",
+    description="""
+    Recibe una lista de URLs de repositorios, elimina los owner/repo duplicados y los consulta en paralelo
+    con concurrencia limitada (`max_concurrency`, acotada por la configuración) y un máximo por host.
+    Responde NDJSON (`application/x-ndjson`) emitiendo cada repositorio en cuanto termina, con su
+    `status_code` (200, 400 URL no válida, 404 no encontrado, 504 timeout...).
+    """,
+    response_description="Un RepoBatchItem por línea, en orden de finalización",
+)
+async def analize_repositories_github_batch(
+    req: RepoBatchRequest,
+    cliente: HTTPClientDep
+):
+    if len(req.items) > config.REPO_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {config.REPO_BULK_MAX_ITEMS} repositorios por petición"
+        )
+
+    urls = [str(item.url) for item in req.items]
+    max_concurrency = min(req.max_concurrency or config.REPO_BULK_MAX_CONCURRENCY, config.REPO_BULK_MAX_CONCURRENCY)
+
+    async def lines():
+        async with aclosing(iter_repo_batch(cliente, urls, max_concurrency)) as items:
+            async for item in items:
+                yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/github-cache/stats",
+    summary="Estadísticas de la cache HTTP de GitHub",
+    description="Hits, revalidaciones 304, llamadas reales al upstream y rate limit restante de GitHub."
+)
+async def github_cache_stats():
+    return github_cache.stats()
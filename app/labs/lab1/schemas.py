@@ -7,6 +7,18 @@ class P1Response(BaseModel):
     action: str = Field(..., description="Tipo de acción que el usuario quiere realizar")
     title: str | None = Field(None, description="Título si aplica (por ejemplo crear tarea)")
     due_date: str | None = Field(None, description="Fecha en formato YYYY-MM-DD si aplica")
+
+class P1BatchRequest(BaseModel):
+    items: list[P1Request] = Field(..., min_length=1, description="Mensajes a analizar")
+    max_concurrency: int | None = Field(None, ge=1, description="Máximo de mensajes analizados a la vez (limitado por la config)")
+
+class P1BatchItem(BaseModel):
+    index: int = Field(..., description="Posición del mensaje en la petición")
+    result: P1Response | None = Field(None, description="Intención detectada si no hubo error")
+    error: str | None = Field(None, description="Error de este mensaje, si lo hubo")
+
+class P1BatchResponse(BaseModel):
+    results: list[P1BatchItem]
     
 class PostResponse1(BaseModel):
     userId: int
@@ -20,4 +32,15 @@ class RepoRequest(BaseModel):
 class RepoResponse(BaseModel):
     name: str
     stars: int
-    lang: str
\ No newline at end of file
+    lang: str
+
+class RepoBatchRequest(BaseModel):
+    items: list[RepoRequest] = Field(..., min_length=1, description="Repositorios a analizar")
+    max_concurrency: int | None = Field(None, ge=1, description="Máximo de repositorios consultados a la vez (limitado por la config)")
+
+class RepoBatchItem(BaseModel):
+    indexes: list[int] = Field(..., description="Posiciones en la petición que apuntan a este repositorio")
+    url: str = Field(..., description="URL tal como llegó en la petición (la primera si hay duplicados)")
+    status_code: int = Field(..., description="200 si se obtuvo, 404 si no existe, 504 si GitHub no respondió a tiempo...")
+    result: RepoResponse | None = Field(None, description="Datos del repositorio si no hubo error")
+    error: str | None = Field(None, description="Error de este repositorio, si lo hubo")
@@ -0,0 +1,503 @@
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from contextlib import aclosing
+from datetime import date
+from typing import Any, AsyncIterator
+from urllib.parse import urlparse
+import httpx
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import Runnable
+from app.batching import BufferedSender, MicroBatcher
+from app.cache import TTLCache
+from app.hedging import HedgePolicy
+from app.http_cache import HTTPCache
+from app.http_client import get_http_client
+from app.jobs import job_queue
+from app.llm_client import llm_registry, llm_singleflight, llm_limiters
+from app.llm_metrics import llm_call_config
+from .classifier import classify_intent
+from .config import config
+from .prompts import intent_prompt
+from .schemas import P1BatchItem, P1Response, RepoBatchItem, RepoResponse
+from .utils import extract_owner_repo
+
+logger = logging.getLogger(__name__)
+
+
+def get_intent_llm() -> Runnable:
+    """
+    LLM con salida estructurada P1Response (cacheado en el registro global).
+    """
+    return llm_registry.get_structured(P1Response)
+
+
+def get_intent_chain() -> Runnable:
+    """
+    Chain `intent_prompt | llm` con salida estructurada (cacheada en el registro global).
+    """
+    return llm_registry.get_chain(intent_prompt, P1Response)
+
+
+def warmup_intent_llm():
+    """
+    Crea los runnables de lab1 al arrancar la app para que la primera request no pague su coste.
+    """
+    get_intent_llm()
+    get_intent_chain()
+
+
+# =============================
+# Micro-batching de llamadas al LLM
+# =============================
+
+def _abatch_config() -> dict:
+    return {"max_concurrency": config.INTENT_BATCH_MAX_CONCURRENCY}
+
+
+async def _abatch(runnable: Runnable, items: list[tuple[Any, dict]]) -> list:
+    # Cada item es (input, config); la config lleva la ruta de origen para las métricas
+    inputs = [item for item, _ in items]
+    configs = [{**call_config, **_abatch_config()} for _, call_config in items]
+    return await runnable.abatch(inputs, config=configs, return_exceptions=True)
+
+
+async def _batch_prompts(items: list[tuple[str, dict]]) -> list:
+    return await _abatch(get_intent_llm(), items)
+
+
+async def _batch_chain_inputs(items: list[tuple[dict, dict]]) -> list:
+    return await _abatch(get_intent_chain(), items)
+
+
+# Un batcher por forma de invocación: prompt ya formateado (/query) o chain (/query-chain)
+intent_batchers = {
+    "prompt": MicroBatcher(
+        _batch_prompts,
+        max_batch_size=config.INTENT_BATCH_MAX_SIZE,
+        max_wait=config.INTENT_BATCH_WINDOW_MS / 1000,
+    ),
+    "chain": MicroBatcher(
+        _batch_chain_inputs,
+        max_batch_size=config.INTENT_BATCH_MAX_SIZE,
+        max_wait=config.INTENT_BATCH_WINDOW_MS / 1000,
+    ),
+}
+
+
+async def close_lab1_batchers():
+    """
+    Apagado: procesa los lotes de intención y las notificaciones que queden pendientes.
+    """
+    for batcher in intent_batchers.values():
+        await batcher.close()
+    # Encola en la cola de trabajos los lotes de notificaciones pendientes
+    await notification_sender.close()
+
+
+def add_notification(intent: str) -> bool:
+    """
+    Añade una notificación al lote en curso. Devuelve False (y lo registra) si se descartó por buffer lleno.
+    """
+    if notification_sender.add(intent):
+        return True
+    logger.warning("Notificación descartada: buffer de notificaciones lleno (%d items)", notification_sender.max_buffer)
+    return False
+
+
+# =============================
+# Notificaciones externas agrupadas
+# =============================
+
+NOTIFY_URL = "https://jsonplaceholder.typicode.com/posts"
+
+
+@job_queue.handler("lab1.notify_external")
+async def notify_external_service(intents: list[str]):
+    """
+    Notifica a un servicio externo un lote de intenciones detectadas con un solo POST.
+    Se ejecuta como trabajo de la cola durable: si falla se reintenta con backoff.
+
+    :param intents: Intenciones acumuladas desde el último envío.
+    :type intents: list[str]
+    """
+    client = get_http_client()
+    response = await client.post(NOTIFY_URL, json={"intents": intents}, timeout=5)
+    response.raise_for_status() # Raise an exception for bad status codes
+
+
+async def enqueue_notifications(intents: list[str]):
+    """
+    Guarda el lote de notificaciones como un trabajo durable (un POST por lote).
+    """
+    await job_queue.enqueue("lab1.notify_external", intents=intents)
+
+
+# Agrupa las notificaciones en memoria durante NOTIFY_BATCH_WINDOW_MS y encola un
+# trabajo por lote: solo lo que aún está en el buffer se pierde si el proceso cae
+notification_sender = BufferedSender(
+    enqueue_notifications,
+    max_batch_size=config.NOTIFY_BATCH_MAX_SIZE,
+    max_wait=config.NOTIFY_BATCH_WINDOW_MS / 1000,
+    max_buffer=config.NOTIFY_BUFFER_MAX_ITEMS,
+    max_inflight=config.NOTIFY_MAX_INFLIGHT_BATCHES,
+)
+
+
+# =============================
+# Hedging de llamadas lentas
+# =============================
+
+intent_hedge = HedgePolicy(
+    enabled=config.INTENT_HEDGE_ENABLED,
+    percentile=config.INTENT_HEDGE_PERCENTILE,
+    budget=config.INTENT_HEDGE_BUDGET,
+    min_delay=config.INTENT_HEDGE_MIN_DELAY_MS / 1000,
+)
+
+
+# =============================
+# Fast-path por reglas
+# =============================
+
+# Contadores por ruta: cuántas intenciones resolvió el clasificador local y cuántas el LLM
+fast_path_counters: dict[str, dict[str, int]] = defaultdict(lambda: {"fast_path": 0, "llm": 0})
+
+
+def try_fast_path(message: str, today: date, route: str) -> P1Response | None:
+    """
+    Devuelve la intención del clasificador local si supera el umbral de confianza.
+    """
+    counters = fast_path_counters[route]
+    if config.INTENT_FAST_PATH_ENABLED:
+        result, confidence = classify_intent(message, today)
+        if confidence >= config.INTENT_FAST_PATH_THRESHOLD:
+            counters["fast_path"] += 1
+            return result
+    counters["llm"] += 1
+    return None
+
+
+def fast_path_stats() -> dict:
+    routes = {}
+    for route, counters in fast_path_counters.items():
+        total = counters["fast_path"] + counters["llm"]
+        routes[route] = {
+            **counters,
+            "hit_rate": round(counters["fast_path"] / total, 4) if total else 0.0,
+        }
+    return {
+        "enabled": config.INTENT_FAST_PATH_ENABLED,
+        "threshold": config.INTENT_FAST_PATH_THRESHOLD,
+        "routes": routes,
+    }
+
+
+# =============================
+# Análisis de intención con cache
+# =============================
+
+# Cache compartida por todas las rutas de intención de lab1
+intent_cache = TTLCache(
+    max_size=config.INTENT_CACHE_MAX_SIZE,
+    ttl=config.INTENT_CACHE_TTL_SECONDS,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normaliza el mensaje para la clave de cache: unicode NFC y espacios colapsados.
+    "Crea  una tarea" y "Crea una tarea " comparten entrada. No se pasa a
+    minúsculas: el título que devuelve el LLM conserva las mayúsculas del mensaje
+    y no debe servirse a otro mensaje que solo difiere en ellas.
+    """
+    message = unicodedata.normalize("NFC", message)
+    return _WHITESPACE.sub(" ", message).strip()
+
+
+async def parse_intent_message(
+    message: str,
+    use_chain: bool = False,
+    route: str = "/lab1/query",
+    bulk: bool = False,
+) -> P1Response:
+    """
+    Analiza la intención de un mensaje: fast-path por reglas, después cache y por último el LLM.
+
+    La clave de cache incluye la fecha `today` que recibe el prompt, de modo que
+    las fechas relativas ("mañana") no se reutilizan de un día para otro.
+
+    :param message: Mensaje original del usuario.
+    :param use_chain: Si es True usa la chain `intent_prompt | llm` en vez del prompt formateado.
+    :param route: Ruta que hace la petición (para las métricas del fast-path).
+    :param bulk: Item de una petición en bloque ya admitida: espera hueco en el limitador en vez de recibir 429/503.
+    """
+    current_date = date.today()
+    fast = try_fast_path(message, current_date, route)
+    if fast is not None:
+        return fast
+
+    today = current_date.strftime("%Y-%m-%d")
+    key = (normalize_message(message), today)
+
+    cached = intent_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def invoke() -> P1Response:
+        call_config = llm_call_config(route)
+        # Con hedging la llamada principal va sola: si pierde, cancelarla corta la llamada
+        # al modelo; dentro de un lote compartido seguiría en curso por los demás items
+        batched = config.INTENT_BATCH_ENABLED and not intent_hedge.enabled
+        if use_chain:
+            chain_input = {"user_message": message, "today": today}
+
+            async def primary() -> P1Response:
+                if batched:
+                    return await intent_batchers["chain"].submit((chain_input, call_config))
+                return await get_intent_chain().ainvoke(chain_input, config=call_config)
+
+            async def hedge() -> P1Response:
+                chain = llm_registry.get_chain(intent_prompt, P1Response, model=config.INTENT_HEDGE_MODEL)
+                return await chain.ainvoke(chain_input, config=llm_call_config(route))
+        else:
+            prompt = intent_prompt.format(user_message=message, today=today)
+
+            async def primary() -> P1Response:
+                if batched:
+                    return await intent_batchers["prompt"].submit((prompt, call_config))
+                return await get_intent_llm().ainvoke(prompt, config=call_config)
+
+            async def hedge() -> P1Response:
+                llm = llm_registry.get_structured(P1Response, model=config.INTENT_HEDGE_MODEL)
+                return await llm.ainvoke(prompt, config=llm_call_config(route))
+
+        # El limitador adaptativo de la ruta acota las llamadas en vuelo al proveedor
+        async with llm_limiters.get(route).slot(wait=bulk):
+            return await intent_hedge.run(primary, hedge)
+
+    # Si el mismo mensaje ya está en vuelo (reintentos, envíos duplicados) se espera esa llamada
+    result = await llm_singleflight.do(("lab1-intent", *key), invoke)
+
+    if result is not None:
+        intent_cache.set(key, result)
+
+    return result
+
+
+# =============================
+# Análisis en bloque
+# =============================
+
+def admit_intent_batch(route: str = "/lab1/query-batch"):
+    """
+    Admite o rechaza (429 con Retry-After) la petición en bloque entera según la cola del limitador de la ruta.
+    """
+    llm_limiters.get(route).admit()
+
+
+async def iter_intent_batch(
+    messages: list[str],
+    max_concurrency: int,
+    route: str = "/lab1/query-batch",
+) -> AsyncIterator[P1BatchItem]:
+    """
+    Analiza varios mensajes con como máximo `max_concurrency` en vuelo.
+
+    Emite cada P1BatchItem en cuanto termina (no en orden); el error de un
+    mensaje se devuelve en su item sin afectar al resto. La petición debe
+    haber pasado antes `admit_intent_batch`: los items esperan hueco en el
+    limitador de la ruta en vez de recibir 429 uno a uno.
+    """
+    queue: asyncio.Queue[P1BatchItem] = asyncio.Queue()
+    # Iterador compartido: cada worker toma el siguiente índice libre
+    pending = iter(range(len(messages)))
+
+    async def worker():
+        for index in pending:
+            try:
+                result = await parse_intent_message(messages[index], route=route, bulk=True)
+                if result is None:
+                    raise ValueError("El modelo no devolvió una respuesta válida")
+                item = P1BatchItem(index=index, result=result)
+            except Exception as e:
+                item = P1BatchItem(index=index, error=str(e))
+            queue.put_nowait(item)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrency, len(messages)))]
+    try:
+        for _ in range(len(messages)):
+            yield await queue.get()
+    finally:
+        # Si el cliente se desconecta se dejan de analizar los mensajes restantes
+        for task in workers:
+            task.cancel()
+
+
+# =============================
+# Streaming de intención (SSE)
+# =============================
+
+async def stream_intent_message(
+    message: str,
+    route: str = "/lab1/query-stream",
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Analiza la intención emitiendo el JSON parcial a medida que el modelo genera tokens.
+
+    Emite eventos ("partial", dict) con el JSON acumulado y al final
+    ("result", dict) validado contra P1Response. Si el mensaje está en cache
+    se emite directamente el resultado, igual que si lo resuelve el fast-path.
+    """
+    current_date = date.today()
+    fast = try_fast_path(message, current_date, route)
+    if fast is not None:
+        yield "result", fast.model_dump()
+        return
+
+    today = current_date.strftime("%Y-%m-%d")
+    key = (normalize_message(message), today)
+
+    cached = intent_cache.get(key)
+    if cached is not None:
+        yield "result", cached.model_dump()
+        return
+
+    # JsonOutputParser va emitiendo el objeto parcial en cada chunk del modelo
+    chain = intent_prompt | llm_registry.get_llm() | JsonOutputParser()
+
+    partial: dict = {}
+    async with llm_limiters.get(route).slot():
+        stream_input = {"user_message": message, "today": today}
+        async with aclosing(chain.astream(stream_input, config=llm_call_config(route))) as stream:
+            async for chunk in stream:
+                if chunk and chunk != partial:
+                    partial = chunk
+                    yield "partial", partial
+
+    result = P1Response.model_validate(partial)
+    intent_cache.set(key, result)
+    yield "result", result.model_dump()
+
+
+# =============================
+# Cache HTTP de la API de GitHub
+# =============================
+
+# GETs a api.github.com: sirve la copia fresca y revalida con ETag cuando caduca
+# (los 304 no consumen rate limit de GitHub)
+github_cache = HTTPCache(
+    max_size=config.GITHUB_CACHE_MAX_SIZE,
+    ttl=config.GITHUB_CACHE_TTL_SECONDS,
+    stale_ttl=config.GITHUB_CACHE_STALE_SECONDS,
+)
+
+
+def repo_summary(repo_data: dict) -> RepoResponse:
+    return RepoResponse(
+        name=repo_data["full_name"],
+        stars=repo_data["stargazers_count"],
+        lang=repo_data["language"] or "No especificado"
+    )
+
+
+# =============================
+# Análisis de repositorios en bloque
+# =============================
+
+class HostPoliteness:
+    """
+    Cortesía por host: como mucho `per_host` peticiones a la vez al mismo host
+    y, opcionalmente, `delay` segundos entre el inicio de dos peticiones.
+    """
+
+    def __init__(self, per_host: int, delay: float = 0.0):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    async def acquire(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        await semaphore.acquire()
+        if self.delay:
+            # Reserva el siguiente hueco libre y espera hasta él
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+            await asyncio.sleep(start - now)
+        return semaphore
+
+
+# Compartida por todas las peticiones: el límite por host es del proceso, no de cada lote
+repo_politeness = HostPoliteness(config.REPO_BULK_PER_HOST_CONCURRENCY, config.REPO_BULK_HOST_DELAY_MS / 1000)
+
+
+async def _fetch_repo(client: httpx.AsyncClient, owner: str, repo: str, politeness: HostPoliteness) -> tuple[int, RepoResponse | None, str | None]:
+    url_api = f"https://api.github.com/repos/{owner}/{repo}"
+    semaphore = await politeness.acquire(urlparse(url_api).hostname)
+    try:
+        resp = await github_cache.get(client, url_api, timeout=config.REPO_BULK_TIMEOUT_SECONDS)
+    except httpx.TimeoutException:
+        return 504, None, "GitHub API no respondió a tiempo"
+    except httpx.HTTPError as e:
+        return 502, None, f"Error al llamar a GitHub: {e}"
+    finally:
+        semaphore.release()
+
+    if resp.status_code == 404:
+        return 404, None, "Repositorio no encontrado"
+    if resp.status_code != 200:
+        return resp.status_code, None, f"GitHub respondió {resp.status_code}"
+    return 200, repo_summary(resp.json()), None
+
+
+async def iter_repo_batch(
+    client: httpx.AsyncClient,
+    urls: list[str],
+    max_concurrency: int,
+) -> AsyncIterator[RepoBatchItem]:
+    """
+    Consulta varios repositorios con como máximo `max_concurrency` en vuelo.
+
+    Las URLs que apuntan al mismo owner/repo se consultan una sola vez (el item
+    lleva todos sus `indexes`). Emite cada RepoBatchItem en cuanto termina; las
+    URLs no válidas salen primero con status 400.
+    """
+    unique: dict[tuple[str, str], list[int]] = {}
+    for index, url in enumerate(urls):
+        try:
+            owner, repo = extract_owner_repo(url)
+        except ValueError as e:
+            yield RepoBatchItem(indexes=[index], url=url, status_code=400, error=str(e))
+            continue
+        unique.setdefault((owner.lower(), repo.lower()), []).append(index)
+
+    if not unique:
+        return
+
+    queue: asyncio.Queue[RepoBatchItem] = asyncio.Queue()
+    pending = iter(unique.items())
+
+    async def worker():
+        for (owner, repo), indexes in pending:
+            url = urls[indexes[0]]
+            try:
+                status_code, result, error = await _fetch_repo(client, owner, repo, repo_politeness)
+            except Exception as e:
+                status_code, result, error = 500, None, str(e)
+            queue.put_nowait(RepoBatchItem(indexes=indexes, url=url, status_code=status_code, result=result, error=error))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrency, len(unique)))]
+    try:
+        for _ in range(len(unique)):
+            yield await queue.get()
+    finally:
+        # Si el cliente se desconecta se dejan de consultar los repositorios restantes
+        for task in workers:
+            task.cancel()
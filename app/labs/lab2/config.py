@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+class Lab2Config:
+    """Configuración centralizada para Lab2"""
+
+    # Almacén de usuarios: "sql" (SQLAlchemy async, base de datos compartida) o "memory"
+    USERS_STORE: str = os.getenv("USERS_STORE", "sql").lower()
+
+    # Cache read-through de get_user (LRU + TTL); los 404 se cachean con un TTL más corto
+    USERS_CACHE_MAX_SIZE: int = int(os.getenv("USERS_CACHE_MAX_SIZE", 10_000))
+    USERS_CACHE_TTL_SECONDS: float = float(os.getenv("USERS_CACHE_TTL_SECONDS", 60))
+    USERS_CACHE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("USERS_CACHE_NEGATIVE_TTL_SECONDS", 5))
+
+    # Consulta en bloque GET /usuarios?ids=...
+    USERS_BULK_MAX_IDS: int = int(os.getenv("USERS_BULK_MAX_IDS", 1000))
+
+    # Listado paginado GET /usuarios?after=...&limit=...
+    USERS_PAGE_DEFAULT_LIMIT: int = int(os.getenv("USERS_PAGE_DEFAULT_LIMIT", 50))
+    USERS_PAGE_MAX_LIMIT: int = int(os.getenv("USERS_PAGE_MAX_LIMIT", 1000))
+
+    # Export NDJSON: filas leídas por vuelta del cursor y líneas por chunk de la respuesta
+    USERS_EXPORT_BATCH_SIZE: int = int(os.getenv("USERS_EXPORT_BATCH_SIZE", 1000))
+
+    # Importación masiva POST /usuarios/import: filas por transacción y errores devueltos como mucho
+    USERS_IMPORT_BATCH_SIZE: int = int(os.getenv("USERS_IMPORT_BATCH_SIZE", 1000))
+    USERS_IMPORT_MAX_BATCH_SIZE: int = int(os.getenv("USERS_IMPORT_MAX_BATCH_SIZE", 10_000))
+    USERS_IMPORT_MAX_ERRORS: int = int(os.getenv("USERS_IMPORT_MAX_ERRORS", 1000))
+
+config = Lab2Config()
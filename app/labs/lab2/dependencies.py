@@ -1,4 +1,6 @@
-from .services import UserService
+from fastapi import Depends
+from app.dataloader import DataLoader
+from .services import UserService, get_user_service_instance
 
 # permite sub dependencias por ejemplo para que dependa de otro servicio donde se obtiene db
 # def get_user_service(db = Depends(get_db)):
@@ -8,9 +10,22 @@ def get_user_service() -> UserService:
     """
     Factory de UserService.
 
+    Devuelve la instancia única creada en el lifespan (con su repository y
+    el pool de conexiones de la app) en vez de construir una por request.
+
     Ventajas:
-    - Permite mock en tests
+    - Permite mock en tests (dependency_overrides)
     - Permite inyectar DB luego
     - Permite config/env
     """
-    return UserService()
+    return get_user_service_instance()
+
+
+def get_user_loader(
+    service: UserService = Depends(get_user_service)
+) -> DataLoader:
+    """
+    DataLoader de usuarios por request: los `load(id)` del mismo tick
+    se resuelven con una sola consulta `IN (...)`.
+    """
+    return DataLoader(service.get_users)
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from itertools import count
+from typing import AsyncIterator
+from .repository import SEED_USERS, DuplicateEmailError
+
+
+class UserRecord:
+    """
+    Usuario en memoria. Con `__slots__` no hay `__dict__` por instancia:
+    ocupa bastante menos que un dict con las mismas tres claves.
+    """
+
+    __slots__ = ("id", "name", "email")
+
+    def __init__(self, id: int, name: str, email: str):
+        self.id = id
+        self.name = name
+        self.email = email
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "email": self.email}
+
+
+class InMemoryUserRepository:
+    """
+    Almacén de usuarios en memoria, sin base de datos, con la misma interfaz que UserRepository.
+
+    - Índice primario id -> UserRecord y secundario email -> id: búsquedas O(1).
+    - El índice de email garantiza que no haya dos usuarios con el mismo email.
+    - La asignación de id y la comprobación de email se hacen bajo un lock,
+      así que es seguro usarlo también desde hilos (rutas `def` síncronas).
+    """
+
+    def __init__(self):
+        self._by_id: dict[int, UserRecord] = {}
+        self._by_email: dict[str, int] = {}
+        self._ids = count(1)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    async def seed(self):
+        """
+        Inserta los usuarios de ejemplo si el almacén está vacío.
+        """
+        if not self._by_id:
+            for user in SEED_USERS:
+                self.add(user["name"], user["email"])
+
+    def add(self, name: str, email: str) -> UserRecord:
+        """
+        Versión síncrona de `create` (seguro entre hilos).
+        """
+        with self._lock:
+            if email in self._by_email:
+                raise DuplicateEmailError(email)
+            record = UserRecord(next(self._ids), name, email)
+            self._by_id[record.id] = record
+            self._by_email[email] = record.id
+            self._last_id = record.id
+        return record
+
+    async def create_many(self, users: list[dict]) -> list[int]:
+        """
+        Inserta varios usuarios {name, email} de una vez y devuelve sus ids.
+        Todo o nada: si algún email ya existe (o se repite en el lote) no se inserta ninguno.
+        """
+        with self._lock:
+            emails = [user["email"] for user in users]
+            if len(set(emails)) != len(emails) or any(email in self._by_email for email in emails):
+                raise DuplicateEmailError("email duplicado en el lote")
+            records = [UserRecord(next(self._ids), user["name"], user["email"]) for user in users]
+            for record in records:
+                self._by_id[record.id] = record
+                self._by_email[record.email] = record.id
+            if records:
+                self._last_id = records[-1].id
+        return [record.id for record in records]
+
+    async def existing_emails(self, emails: list[str]) -> set[str]:
+        return {email for email in emails if email in self._by_email}
+
+    async def get(self, user_id: int) -> dict | None:
+        record = self._by_id.get(user_id)
+        return record.as_dict() if record else None
+
+    async def get_many(self, user_ids: list[int]) -> dict[int, dict]:
+        """
+        Varios usuarios por id. Los que no existen no aparecen.
+        """
+        by_id = self._by_id
+        return {
+            user_id: record.as_dict()
+            for user_id in user_ids
+            if (record := by_id.get(user_id)) is not None
+        }
+
+    async def list_page(self, after: int, limit: int) -> list[dict]:
+        """
+        Paginación keyset por id. Los ids son consecutivos (se asignan bajo lock y no hay
+        borrados), así que se recorren a partir de `after` sin tocar los anteriores.
+        """
+        page = []
+        by_id = self._by_id
+        for user_id in range(max(after, 0) + 1, self._last_id + 1):
+            record = by_id.get(user_id)
+            if record is not None:
+                page.append(record.as_dict())
+                if len(page) == limit:
+                    break
+        return page
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Todos los usuarios por id, cediendo el event loop cada `batch_size`.
+        """
+        by_id = self._by_id
+        for user_id in range(1, self._last_id + 1):
+            record = by_id.get(user_id)
+            if record is not None:
+                yield record.as_dict()
+            if user_id % batch_size == 0:
+                await asyncio.sleep(0)
+
+    async def get_by_email(self, email: str) -> dict | None:
+        user_id = self._by_email.get(email)
+        return None if user_id is None else self._by_id[user_id].as_dict()
+
+    async def create(self, name: str, email: str) -> dict:
+        return self.add(name, email).as_dict()
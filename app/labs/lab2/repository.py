@@ -0,0 +1,164 @@
+from typing import AsyncIterator
+from sqlalchemy import Column, Index, Integer, String, Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.database import metadata
+
+users_table = Table(
+    "lab2_users",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("name", String(255), nullable=False),
+    Column("email", String(320), nullable=False),
+    # Índice único por email para búsquedas y para impedir duplicados (ver UserRepository.migrate)
+    Index("lab2_users_email_key", "email", unique=True),
+)
+
+# Usuarios de ejemplo (los mismos que tenía el servicio en memoria)
+SEED_USERS = [
+    {"name": "Ana", "email": "ana@example.com"},
+    {"name": "Luis", "email": "luis@example.com"},
+]
+
+
+class DuplicateEmailError(ValueError):
+    """Ya existe un usuario con ese email"""
+
+
+class UserRepository:
+    """
+    Acceso a datos de usuarios sobre SQLAlchemy async (Core).
+
+    Usa el engine compartido de la app: cada operación toma una conexión
+    del pool y la devuelve al terminar.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def migrate(self):
+        """
+        Crea el índice único por email en tablas creadas antes de tenerlo
+        (`create_all` no añade índices a una tabla que ya existe).
+
+        Si ya hay emails duplicados no se puede crear: la app no arranca y
+        el error indica cuántos hay que resolver a mano.
+        """
+        email_key = next(index for index in users_table.indexes if index.name == "lab2_users_email_key")
+        try:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: email_key.create(sync_conn, checkfirst=True))
+        except IntegrityError as e:
+            async with self.engine.connect() as conn:
+                duplicated = (await conn.execute(
+                    select(func.count()).select_from(
+                        select(users_table.c.email)
+                        .group_by(users_table.c.email)
+                        .having(func.count() > 1)
+                        .subquery()
+                    )
+                )).scalar_one()
+            raise RuntimeError(
+                f"lab2_users tiene {duplicated} emails duplicados: no se puede crear el índice único por email"
+            ) from e
+
+    async def seed(self):
+        """
+        Inserta los usuarios de ejemplo si la tabla está vacía.
+        """
+        async with self.engine.begin() as conn:
+            count = (await conn.execute(select(func.count()).select_from(users_table))).scalar_one()
+            if count == 0:
+                await conn.execute(insert(users_table), SEED_USERS)
+
+    async def get(self, user_id: int) -> dict | None:
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(
+                select(users_table).where(users_table.c.id == user_id)
+            )).mappings().first()
+        return dict(row) if row else None
+
+    async def get_many(self, user_ids: list[int]) -> dict[int, dict]:
+        """
+        Varios usuarios en una sola consulta (`WHERE id IN (...)`). Los que no existen no aparecen.
+        """
+        if not user_ids:
+            return {}
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(
+                select(users_table).where(users_table.c.id.in_(user_ids))
+            )).mappings().all()
+        return {row["id"]: dict(row) for row in rows}
+
+    async def list_page(self, after: int, limit: int) -> list[dict]:
+        """
+        Paginación keyset: los `limit` usuarios con id > `after`, por id.
+        Usa el índice de la clave primaria, así que cualquier página cuesta lo mismo que la primera.
+        """
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(
+                select(users_table)
+                .where(users_table.c.id > after)
+                .order_by(users_table.c.id)
+                .limit(limit)
+            )).mappings().all()
+        return [dict(row) for row in rows]
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Todos los usuarios por id con un cursor de servidor: se leen de `batch_size`
+        en `batch_size`, sin cargar la tabla entera en memoria.
+        """
+        async with self.engine.connect() as conn:
+            result = await conn.stream(
+                select(users_table)
+                .order_by(users_table.c.id)
+                .execution_options(yield_per=batch_size)
+            )
+            # Por particiones: un salto al driver async por lote y no por fila
+            async for rows in result.mappings().partitions():
+                for row in rows:
+                    yield dict(row)
+
+    async def create_many(self, users: list[dict]) -> list[int]:
+        """
+        Inserta varios usuarios {name, email} en una sola transacción y devuelve sus ids
+        (sin orden garantizado: pedirlo obliga a SQLAlchemy a insertar fila a fila en SQLite).
+        Si alguno choca con un email existente no se inserta ninguno (DuplicateEmailError).
+        """
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    insert(users_table).returning(users_table.c.id),
+                    users,
+                )
+                return list(result.scalars())
+        except IntegrityError as e:
+            raise DuplicateEmailError(str(e.orig)) from e
+
+    async def existing_emails(self, emails: list[str]) -> set[str]:
+        """
+        Cuáles de estos emails ya están registrados (una consulta `IN` sobre el índice único).
+        """
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(select(users_table.c.email).where(users_table.c.email.in_(emails)))
+        return set(rows.scalars())
+
+    async def get_by_email(self, email: str) -> dict | None:
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(
+                select(users_table).where(users_table.c.email == email)
+            )).mappings().first()
+        return dict(row) if row else None
+
+    async def create(self, name: str, email: str) -> dict:
+        # El id lo asigna la base de datos (autoincrement), sin recorrer los existentes
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    insert(users_table).values(name=name, email=email).returning(users_table.c.id)
+                )
+                new_id = result.scalar_one()
+        except IntegrityError as e:
+            raise DuplicateEmailError(email) from e
+        return {"id": new_id, "name": name, "email": email}
@@ -1,9 +1,14 @@
+import json
+from contextlib import aclosing
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from .schemas import P2Response, P2Request
-from .services import UserService
-from .dependencies import get_user_service
+from app.dataloader import DataLoader
+from .config import config
+from .schemas import P2Response, P2Request, P2LookupItem, P2BulkResponse, P2Page, P2ImportResponse
+from .services import UserService, parse_import_rows
+from .dependencies import get_user_service, get_user_loader
 
 router = APIRouter(
     prefix="/lab2",
@@ -16,11 +21,113 @@ UserServiceDep = Annotated[
     Depends(get_user_service)  # Factory explícita (mejor que Depends())
 ]
 
+# DataLoader por request (agrupa las búsquedas por id del mismo tick)
+UserLoaderDep = Annotated[
+    DataLoader,
+    Depends(get_user_loader)
+]
+
+
+@router.get(
+    "/usuarios",
+    response_model=P2Page | P2BulkResponse,
+    summary="Lista usuarios paginados u obtiene varios por id en una sola petición"
+)
+async def get_users(
+    service: UserServiceDep,
+    loader: UserLoaderDep,
+    ids: list[str] | None = Query(None, description="ids separados por comas (`?ids=1,2,3`) o repetidos (`?ids=1&ids=2`)"),
+    after: int = Query(0, ge=0, description="cursor: devuelve usuarios con id mayor que este (`next_cursor` de la página anterior)"),
+    limit: int | None = Query(None, ge=1, description="tamaño de página")
+):
+    """
+    Endpoint: Listar usuarios / obtener varios usuarios.
+
+    - Sin `ids`: página de usuarios por id ascendente (paginación keyset con
+      `after` + `limit`), cualquier página cuesta lo mismo que la primera.
+    - Con `ids`: todas las búsquedas se resuelven con una sola consulta; los ids
+      que no existen vuelven con `found: false` en vez de un 404 para todo el lote.
+    """
+    if ids is None:
+        page_size = min(limit or config.USERS_PAGE_DEFAULT_LIMIT, config.USERS_PAGE_MAX_LIMIT)
+        users, next_cursor = await service.list_users(after, page_size)
+        return P2Page(items=users, next_cursor=next_cursor)
+
+    try:
+        user_ids = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids debe ser una lista de enteros")
+    if len(user_ids) > config.USERS_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {config.USERS_BULK_MAX_IDS} ids por petición"
+        )
+
+    users = await loader.load_many(user_ids)
+    return P2BulkResponse(results=[
+        P2LookupItem(id=user_id, found=user is not None, user=user)
+        for user_id, user in zip(user_ids, users)
+    ])
+
+@router.get(
+    "/usuarios/export",
+    summary="Exporta todos los usuarios en NDJSON",
+    description="""
+    Responde NDJSON (`application/x-ndjson`), un usuario por línea y por id ascendente.
+    Los usuarios se leen con un cursor de servidor y se serializan según llegan,
+    así que la memoria no crece con el número de usuarios.
+    """,
+    response_description="Un P2Response por línea"
+)
+async def export_users(
+    service: UserServiceDep
+):
+    batch_size = config.USERS_EXPORT_BATCH_SIZE
+
+    async def lines():
+        chunk = []
+        async with aclosing(service.iter_users(batch_size)) as users:
+            async for user in users:
+                chunk.append(json.dumps(user, ensure_ascii=False) + "\n")
+                # Se envía por bloques de líneas: un send ASGI por fila sería muy lento con millones
+                if len(chunk) >= batch_size:
+                    yield "".join(chunk)
+                    chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get(
+    "/user-cache/stats",
+    summary="Estadísticas de la cache de usuarios",
+    description="Tamaño, hits/misses y hit ratio de la cache de get_user, 404 servidos desde cache, invalidaciones y lecturas coalescidas."
+)
+async def user_cache_stats(
+    service: UserServiceDep
+):
+    return service.cache_stats()
+
+@router.get(
+    "/usuarios/email/{email}",
+    response_model=P2Response,
+    summary="Obtiene un usuario por email"
+)
+async def get_user_by_email(
+    email: str,
+    service: UserServiceDep
+):
+    """
+    Endpoint: Obtener usuario por email (índice único).
+    """
+
+    return await service.get_user_by_email(email)
+
 @router.get(
     "/usuarios/{user_id}",
     response_model=P2Response
 )
-def get_user(
+async def get_user(
     user_id: int,
     service: UserServiceDep
 ):
@@ -29,14 +136,14 @@ def get_user(
     FastAPI inyecta automáticamente UserService.
     """
 
-    return service.get_user(user_id)
+    return await service.get_user(user_id)
 
 
 @router.post(
     "/usuarios",
     response_model=P2Response
 )
-def create_user(
+async def create_user(
     req: P2Request,
     service: UserServiceDep
 ):
@@ -44,4 +151,30 @@ def create_user(
     Endpoint: Crear usuario.
     """
 
-    return service.create_user(req.name, req.email)
+    return await service.create_user(req.name, req.email)
+
+
+@router.post(
+    "/usuarios/import",
+    response_model=P2ImportResponse,
+    summary="Importación masiva de usuarios (NDJSON o CSV)",
+    description="""
+    El cuerpo es NDJSON (un P2Request por línea) o, con `Content-Type: text/csv`,
+    CSV con cabecera `name,email`. Se lee en streaming, cada fila se valida por
+    separado y las válidas se insertan por lotes de `batch_size` en una
+    transacción cada uno. Las filas con error no paran la importación: vuelven
+    en `errors` con su número de línea.
+    """
+)
+async def import_users(
+    request: Request,
+    service: UserServiceDep,
+    batch_size: int | None = Query(None, ge=1, description="filas por transacción")
+):
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    size = min(batch_size or config.USERS_IMPORT_BATCH_SIZE, config.USERS_IMPORT_MAX_BATCH_SIZE)
+    return await service.import_users(
+        parse_import_rows(request.stream(), fmt),
+        batch_size=size,
+        max_errors=config.USERS_IMPORT_MAX_ERRORS,
+    )
@@ -11,3 +11,36 @@ class P2Response(BaseModel):
     id: int = Field(..., description="id de usuario")
     name: str = Field(..., description="nombre de usuario")
     email: str = Field(..., description="email de usuario", example="francisco.aragon@example.com")
+
+
+class P2LookupItem(BaseModel):
+    # Resultado de un id en la consulta en bloque
+    id: int = Field(..., description="id solicitado")
+    found: bool = Field(..., description="False si el usuario no existe")
+    user: P2Response | None = Field(None, description="usuario, si existe")
+
+
+class P2BulkResponse(BaseModel):
+    results: list[P2LookupItem] = Field(..., description="un resultado por id, en el orden pedido")
+
+
+class P2Page(BaseModel):
+    # Página del listado de usuarios (paginación keyset por id)
+    items: list[P2Response] = Field(..., description="usuarios de la página, por id ascendente")
+    next_cursor: int | None = Field(None, description="valor de `after` para la siguiente página; null si es la última")
+
+
+class P2ImportError(BaseModel):
+    row: int = Field(..., description="número de línea en el fichero (empezando en 1)")
+    error: str = Field(..., description="motivo por el que no se importó")
+
+
+class P2ImportResponse(BaseModel):
+    # Resultado de la importación masiva
+    received: int = Field(..., description="filas leídas (sin contar líneas vacías ni la cabecera CSV)")
+    imported: int = Field(..., description="usuarios creados")
+    failed: int = Field(..., description="filas con error")
+    errors: list[P2ImportError] = Field(..., description="errores por fila (como mucho USERS_IMPORT_MAX_ERRORS)")
+    errors_truncated: bool = Field(..., description="True si hubo más errores de los devueltos")
+    elapsed_seconds: float = Field(..., description="duración total, incluida la lectura del cuerpo")
+    rows_per_second: float = Field(..., description="filas procesadas por segundo")
@@ -1,24 +1,72 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator
 from fastapi import HTTPException
+from pydantic import ValidationError
+from app.cache import TTLCache
+from app.database import database
+from app.singleflight import SingleFlight
+from .config import config
+from .memory_store import InMemoryUserRepository
+from .repository import DuplicateEmailError, UserRepository
+from .schemas import P2Request
+
+_MISSING = object()
+
 
 class UserService:
     """
     Servicio de lógica de negocio.
-    En producción normalmente usaría un repository o DB session.
+    Delega la persistencia en un repository (SQLAlchemy async o en memoria).
+
+    `get_user` es read-through sobre una cache LRU + TTL: también guarda los
+    "no existe" (con un TTL más corto) para que quien recorre ids no llegue al
+    repository, y las escrituras invalidan la entrada del usuario afectado.
     """
 
-    def __init__(self):
-        # ⚠️ Solo demo: memoria local
-        # En producción esto vendría de DB
-        self.users = {
-            1: {"id": 1, "name": "Ana", "email": "ana@example.com"},
-            2: {"id": 2, "name": "Luis", "email": "luis@example.com"}
-        }
+    def __init__(
+        self,
+        repository: UserRepository | InMemoryUserRepository,
+        cache_max_size: int = config.USERS_CACHE_MAX_SIZE,
+        cache_ttl: float = config.USERS_CACHE_TTL_SECONDS,
+        negative_ttl: float = config.USERS_CACHE_NEGATIVE_TTL_SECONDS,
+    ):
+        self.repository = repository
+        self.cache = TTLCache(max_size=cache_max_size, ttl=cache_ttl)
+        self.negative_ttl = negative_ttl
+        # Misses concurrentes del mismo id comparten una sola lectura
+        self._loads = SingleFlight()
+        # Cambia en cada invalidación: una lectura que empezó antes no guarda su resultado
+        self._generation = 0
+        self.negative_hits = 0
+        self.invalidations = 0
+
+    async def _load_user(self, user_id: int) -> dict | None:
+        generation = self._generation
+        user = await self.repository.get(user_id)
+        if generation == self._generation:
+            self.cache.set(user_id, user, ttl=None if user else self.negative_ttl)
+        return user
+
+    def invalidate_user(self, user_id: int):
+        """
+        Quita un usuario de la cache (llamar tras cualquier escritura que le afecte).
+        """
+        self._generation += 1
+        self.cache.invalidate(user_id)
+        self.invalidations += 1
 
-    def get_user(self, user_id: int) -> dict:
+    async def get_user(self, user_id: int) -> dict:
         """
-        Busca usuario por ID.
+        Busca usuario por ID (cache read-through).
         """
-        user = self.users.get(user_id)
+        user = self.cache.get(user_id, _MISSING)
+        if user is _MISSING:
+            user = await self._loads.do(user_id, lambda: self._load_user(user_id))
+        elif user is None:
+            self.negative_hits += 1
 
         if not user:
             # OK para proyectos pequeños
@@ -27,7 +75,41 @@ class UserService:
 
         return user
 
-    def create_user(self, name: str, email: str) -> dict:
+    async def get_users(self, user_ids: list[int]) -> dict[int, dict]:
+        """
+        Busca varios usuarios a la vez. Los ids que no existen no aparecen en el resultado.
+        """
+        return await self.repository.get_many(user_ids)
+
+    async def list_users(self, after: int = 0, limit: int = 50) -> tuple[list[dict], int | None]:
+        """
+        Página de usuarios por id (keyset) y cursor de la siguiente página (None si es la última).
+        """
+        # Se pide uno de más para saber si hay otra página sin una consulta extra
+        users = await self.repository.list_page(after, limit + 1)
+        if len(users) > limit:
+            users = users[:limit]
+            return users, users[-1]["id"]
+        return users, None
+
+    def iter_users(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """
+        Todos los usuarios, uno a uno, sin construir la lista completa.
+        """
+        return self.repository.iter_all(batch_size)
+
+    async def get_user_by_email(self, email: str) -> dict:
+        """
+        Busca usuario por email (índice único).
+        """
+        user = await self.repository.get_by_email(email)
+
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+        return user
+
+    async def create_user(self, name: str, email: str) -> dict:
         """
         Valida y crea usuario.
         """
@@ -36,14 +118,183 @@ class UserService:
         if "@" not in email:
             raise HTTPException(status_code=400, detail="Email inválido")
 
-        new_id = max(self.users.keys()) + 1
+        try:
+            user = await self.repository.create(name, email)
+        except DuplicateEmailError:
+            raise HTTPException(status_code=409, detail="Ya existe un usuario con ese email")
 
-        new_user = {
-            "id": new_id,
-            "name": name,
-            "email": email
+        # Puede haber un "no existe" cacheado para este id (clientes que recorren ids)
+        self.invalidate_user(user["id"])
+        return user
+
+    async def import_users(
+        self,
+        rows: AsyncIterator[tuple[int, dict | str]],
+        batch_size: int = 1000,
+        max_errors: int = 1000,
+    ) -> dict:
+        """
+        Importación masiva. `rows` produce (número de línea, fila) o (línea, error de parseo).
+
+        Cada fila se valida como P2Request (más la misma validación que create_user);
+        las válidas se insertan por lotes de `batch_size`, un lote por transacción.
+        Si un lote falla por emails duplicados se reintenta fila a fila para
+        saber cuáles fallan. Los errores no paran la importación: se devuelven
+        por fila (como mucho `max_errors`).
+        """
+        started = time.perf_counter()
+        report = {"received": 0, "imported": 0, "failed": 0, "errors": []}
+
+        def fail(line: int, error: str):
+            report["failed"] += 1
+            if len(report["errors"]) < max_errors:
+                report["errors"].append({"row": line, "error": error})
+
+        async def insert(batch: list[tuple[int, dict]]) -> list[int]:
+            try:
+                return await self.repository.create_many([user for _, user in batch])
+            except DuplicateEmailError:
+                pass
+            # Se quitan los emails repetidos (ya registrados o dentro del lote) y se reintenta el resto
+            existing = await self.repository.existing_emails([user["email"] for _, user in batch])
+            clean = []
+            for line, user in batch:
+                if user["email"] in existing:
+                    fail(line, "Ya existe un usuario con ese email")
+                else:
+                    existing.add(user["email"])
+                    clean.append((line, user))
+            try:
+                return await self.repository.create_many([user for _, user in clean]) if clean else []
+            except DuplicateEmailError:
+                pass
+            # Otro cliente ha creado alguno de estos emails entretanto: fila a fila
+            ids = []
+            for line, user in clean:
+                try:
+                    ids.append((await self.repository.create(user["name"], user["email"]))["id"])
+                except DuplicateEmailError:
+                    fail(line, "Ya existe un usuario con ese email")
+            return ids
+
+        async def flush(batch: list[tuple[int, dict]]):
+            ids = await insert(batch)
+            report["imported"] += len(ids)
+            for user_id in ids:
+                self.invalidate_user(user_id)
+
+        batch: list[tuple[int, dict]] = []
+        async for line, row in rows:
+            report["received"] += 1
+            if isinstance(row, str):
+                fail(line, row)
+                continue
+            try:
+                req = P2Request.model_validate(row)
+            except ValidationError as e:
+                fail(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            if "@" not in req.email:
+                fail(line, "Email inválido")
+                continue
+            batch.append((line, {"name": req.name, "email": req.email}))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        elapsed = time.perf_counter() - started
+        # Los duplicados se detectan al insertar el lote: se reordenan por línea
+        report["errors"].sort(key=lambda err: err["row"])
+        report["errors_truncated"] = report["failed"] > len(report["errors"])
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["received"] / elapsed, 1) if elapsed else 0.0
+        return report
+
+    def cache_stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "negative_ttl_seconds": self.negative_ttl,
+            "negative_hits": self.negative_hits,
+            "invalidations": self.invalidations,
+            "coalesced_loads": self._loads.saved,
         }
 
-        self.users[new_id] = new_user
 
-        return new_user
+# =============================
+# Parseo incremental de ficheros de importación
+# =============================
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """
+    Líneas (número desde 1, texto) de un cuerpo UTF-8 que llega por trozos, sin leerlo entero.
+    Se quita el BOM inicial si lo hay (CSV exportados desde Excel).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+async def parse_import_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | str]]:
+    """
+    Filas (línea, dict) de un cuerpo NDJSON o CSV (con cabecera); (línea, mensaje) si la línea no se puede leer.
+    Las líneas vacías se ignoran. En CSV no se admiten saltos de línea dentro de un campo.
+    """
+    header: list[str] | None = None
+    async for line_no, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, f"Se esperaban {len(header)} columnas y hay {len(values)}"
+                continue
+            yield line_no, dict(zip(header, values))
+        else:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, "JSON inválido"
+                continue
+            yield line_no, row if isinstance(row, dict) else "Se esperaba un objeto JSON"
+
+
+# =============================
+# Instancia única por proceso
+# =============================
+
+_user_service: UserService | None = None
+
+
+async def init_user_service():
+    """
+    Crea el servicio (lifespan de la app) y carga los usuarios de ejemplo.
+    Con USERS_STORE=memory no usa la base de datos: almacén en memoria indexado.
+    """
+    global _user_service
+    if config.USERS_STORE == "memory":
+        repository = InMemoryUserRepository()
+    else:
+        repository = UserRepository(database.engine)
+        await repository.migrate()
+    await repository.seed()
+    _user_service = UserService(repository)
+
+
+def get_user_service_instance() -> UserService:
+    if _user_service is None:
+        raise RuntimeError("UserService no está inicializado (¿se ejecutó el lifespan de la app?)")
+    return _user_service
@@ -0,0 +1,16 @@
+import os
+from dotenv import load_dotenv
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+class Lab3Config:
+    """Configuración centralizada para Lab3"""
+
+    # Rate limit por API key: max_requests (ConfigService.get_limit) por ventana, token bucket
+    RATE_LIMIT_WINDOW_SECONDS: float = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", 60))
+    RATE_LIMIT_SHARDS: int = int(os.getenv("RATE_LIMIT_SHARDS", 64))
+    # Tiempo sin uso tras el que se olvida una clave (como mínimo la ventana)
+    RATE_LIMIT_IDLE_SECONDS: float = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", 300))
+
+config = Lab3Config()
@@ -1,5 +1,6 @@
-from fastapi import Depends, Header
-from .services import ConfigService
+import math
+from fastapi import Depends, Header, HTTPException, Request, Response
+from .services import ConfigService, rate_limiter
 
 def get_api_key(
     api_key: str = Header(..., description="API Key de autenticación")
@@ -18,3 +19,51 @@ def get_config_service(
     Permite escalar luego (DB, cache, etc).
     """
     return ConfigService(api_key=api_key)
+
+
+async def rate_limit_dependency(
+    request: Request,
+    response: Response,
+    service: ConfigService = Depends(get_config_service)
+):
+    """
+    🔥 Dependency GLOBAL del router: aplica el límite de ConfigService.get_limit
+    por API key (token bucket, ventana RATE_LIMIT_WINDOW_SECONDS).
+
+    Solo las API keys válidas tienen bucket propio: las inválidas comparten
+    el de la IP del cliente (así rotar keys falsas no crea buckets ni esquiva
+    el límite) y después reciben 403.
+
+    Es async (no ocupa el threadpool) y con yield: las cabeceras X-RateLimit-*
+    se añaden también cuando la ruta responde con un HTTPException. Al
+    agotarse el límite responde 429 con Retry-After.
+    """
+    limit = service.get_limit()
+    valid = service.validate_api_key()
+    if valid:
+        key = service.api_key
+    else:
+        key = ("ip", request.client.host if request.client else "unknown")
+    allowed, remaining, retry_after = rate_limiter.hit(key, limit)
+    headers = {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(int(remaining)),
+        # Segundos hasta tener el bucket lleno otra vez
+        "X-RateLimit-Reset": str(math.ceil((limit - remaining) * rate_limiter.window / limit)),
+    }
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Límite de peticiones superado",
+            headers={**headers, "Retry-After": str(math.ceil(retry_after))},
+        )
+    if not valid:
+        raise HTTPException(status_code=403, detail="API Key inválida", headers=headers)
+
+    response.headers.update(headers)
+    try:
+        yield
+    except HTTPException as e:
+        # La respuesta de error no es `response`: se le pasan las cabeceras
+        e.headers = {**headers, **(e.headers or {})}
+        raise
@@ -1,12 +1,15 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
 
-from .services import ConfigService
-from .dependencies import get_config_service
+from .services import ConfigService, rate_limiter
+from .dependencies import get_config_service, rate_limit_dependency
 
 router = APIRouter(
     prefix="/lab3",
-    tags=["Lab3 - servicios inyectados"]
+    tags=["Lab3 - servicios inyectados"],
+
+    # 🔥 Rate limit por API key en TODAS las rutas
+    dependencies=[Depends(rate_limit_dependency)]
 )
 
 # Dependency tipada reutilizable
@@ -30,3 +33,11 @@ def obtener_limite(
     return {
         "limite": service.get_limit()
     }
+
+
+@router.get("/rate-limit/stats")
+async def rate_limit_stats():
+    """
+    Claves activas, requests permitidas/rechazadas y claves olvidadas por inactividad.
+    """
+    return rate_limiter.stats()
@@ -1,4 +1,6 @@
 from fastapi import HTTPException
+from app.rate_limit import TokenBucketLimiter
+from .config import config
 
 class ConfigService:
     """
@@ -36,3 +38,14 @@ class ConfigService:
                 status_code=403,
                 detail="API Key inválida"
             )
+
+
+# =============================
+# Rate limit por API key (compartido por todas las requests del proceso)
+# =============================
+
+rate_limiter = TokenBucketLimiter(
+    window=config.RATE_LIMIT_WINDOW_SECONDS,
+    shards=config.RATE_LIMIT_SHARDS,
+    idle_ttl=config.RATE_LIMIT_IDLE_SECONDS,
+)
@@ -0,0 +1,277 @@
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+from collections import Counter, deque
+from app.batch_writer import BatchWriter
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit (
+    id INTEGER PRIMARY KEY,
+    client_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    route TEXT NOT NULL,
+    ts REAL NOT NULL,
+    latency_ms REAL,
+    status INTEGER
+)
+"""
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS audit_client_ts ON audit (client_id, ts)",
+    "CREATE INDEX IF NOT EXISTS audit_url ON audit (url)",
+)
+
+
+class AuditRollups:
+    """
+    Agregados en memoria mantenidos de forma incremental (O(1) amortizado por registro).
+
+    - Totales por cliente y por ruta desde el inicio.
+    - Conteos por minuto (total y por cliente) de los últimos
+      `retention_minutes`, para consultas por rango de tiempo sin escanear la tabla.
+
+    Los conteos por cliente guardan como mucho `max_clients` entradas (en el
+    total y en cada minuto): al llegar al doble se quedan los `max_clients`
+    más activos y el resto se suma a `other_clients`. Los top-N siguen siendo
+    exactos mientras los clientes descartados no vuelvan a ser de los más activos.
+
+    Se actualizan desde el hilo de escritura y se leen desde el event loop,
+    así que todo el acceso va con un lock.
+    """
+
+    def __init__(self, retention_minutes: int = 1440, max_clients: int = 10_000):
+        self.retention_minutes = retention_minutes
+        self.max_clients = max_clients
+        self.by_client: Counter[str] = Counter()
+        self.by_route: Counter[str] = Counter()
+        self.per_minute: dict[int, int] = {}
+        self.per_minute_client: dict[int, Counter[str]] = {}
+        # Minutos en orden de aparición, para podar los más antiguos
+        self._minutes: deque[int] = deque()
+        self._latest_minute = 0
+        self._lock = threading.Lock()
+        self.total = 0
+        self.other_clients = 0
+
+    def add_records(self, records: list[dict]):
+        """
+        Suma un lote de registros {client_id, route, ts} ya escritos.
+        """
+        with self._lock:
+            for record in records:
+                client_id = record["client_id"]
+                self.total += 1
+                self.by_client[client_id] += 1
+                self.by_route[record["route"]] += 1
+                self.add_minute(int(record["ts"] // 60), client_id, 1)
+            self.other_clients += self._compact(self.by_client)
+
+    def add_minute(self, minute: int, client_id: str, count: int):
+        if minute <= self._latest_minute - self.retention_minutes:
+            return
+        if minute not in self.per_minute:
+            self.per_minute[minute] = 0
+            self.per_minute_client[minute] = Counter()
+            self._minutes.append(minute)
+            if minute > self._latest_minute:
+                self._latest_minute = minute
+                self._prune()
+        self.per_minute[minute] += count
+        clients = self.per_minute_client[minute]
+        clients[client_id] += count
+        self._compact(clients)
+
+    def _compact(self, counts: Counter[str]) -> int:
+        """
+        Deja los `max_clients` clientes con más accesos si se ha llegado al doble; devuelve lo descartado.
+        """
+        if len(counts) < 2 * self.max_clients:
+            return 0
+        kept = dict(heapq.nlargest(self.max_clients, counts.items(), key=lambda item: item[1]))
+        dropped = counts.total() - sum(kept.values())
+        counts.clear()
+        counts.update(kept)
+        return dropped
+
+    def _prune(self):
+        cutoff = self._latest_minute - self.retention_minutes
+        while self._minutes and self._minutes[0] <= cutoff:
+            minute = self._minutes.popleft()
+            self.per_minute.pop(minute, None)
+            self.per_minute_client.pop(minute, None)
+
+    def _minutes_in(self, since: float | None, until: float | None) -> list[int]:
+        low = -1 if since is None else int(since // 60)
+        high = float("inf") if until is None else int(until // 60)
+        return [minute for minute in self.per_minute if low <= minute <= high]
+
+    def top_clients(self, n: int, since: float | None = None, until: float | None = None) -> list[tuple[str, int]]:
+        """
+        Top-N clientes por número de accesos (en todo el histórico o en un rango, con resolución de minuto).
+        """
+        with self._lock:
+            if since is None and until is None:
+                return self.by_client.most_common(n)
+            counts: Counter[str] = Counter()
+            for minute in self._minutes_in(since, until):
+                counts.update(self.per_minute_client[minute])
+        return heapq.nlargest(n, counts.items(), key=lambda item: item[1])
+
+    def route_counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.by_route.most_common())
+
+    def timeline(self, since: float | None = None, until: float | None = None) -> list[tuple[int, int]]:
+        """
+        Accesos por minuto (epoch del inicio del minuto, conteo), en orden.
+        """
+        with self._lock:
+            return [(minute * 60, self.per_minute[minute]) for minute in sorted(self._minutes_in(since, until))]
+
+
+class AuditStore(BatchWriter):
+    """
+    Registro de auditoría persistente en SQLite (modo WAL).
+
+    Hereda de BatchWriter: `log` no bloquea y los registros se insertan por
+    lotes (una transacción por lote) en el hilo de escritura. Las rollups se
+    actualizan en ese hilo después de cada lote escrito (solo cuentan lo que
+    está en la base de datos), así que los endpoints de agregados no tocan
+    SQLite; las consultas de registros sueltos usan los índices (client_id, ts) y (url).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 100_000,
+        batch_size: int = 5_000,
+        flush_interval: float = 0.5,
+        retention_minutes: int = 1440,
+        max_clients: int = 10_000,
+    ):
+        super().__init__(max_queue=max_queue, batch_size=batch_size, flush_interval=flush_interval)
+        self.path = path
+        self.rollups = AuditRollups(retention_minutes, max_clients)
+        self._conn: sqlite3.Connection | None = None
+        self._read_conn: sqlite3.Connection | None = None
+        self._read_lock = threading.Lock()
+
+    # ---------- Destino SQLite (hilo de escritura) ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open_sink(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute(_SCHEMA)
+        for index in _INDEXES:
+            self._conn.execute(index)
+        self._conn.commit()
+        # Conexión aparte para las lecturas: en WAL no esperan a las escrituras
+        self._read_conn = self._conn if self.path == ":memory:" else self._connect()
+        # Aún no se ha escrito ningún lote: lo encolado antes de arrancar se suma al escribirse
+        self.rollups = self._load_rollups()
+
+    def _write_records(self, batch: list[dict]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO audit (client_id, url, route, ts, latency_ms, status) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (r["client_id"], r["url"], r["route"], r["ts"], r.get("latency_ms"), r.get("status"))
+                    for r in batch
+                ],
+            )
+        # Tras el commit: un lote que falla no cuenta en los agregados
+        self.rollups.add_records(batch)
+
+    def _close_sink(self):
+        if self._read_conn is not None and self._read_conn is not self._conn:
+            self._read_conn.close()
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._read_conn = None
+
+    # ---------- Lecturas ----------
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def _load_rollups(self) -> AuditRollups:
+        """
+        Reconstruye las rollups con lo que ya había en la base de datos (una vez, al arrancar).
+        """
+        rollups = AuditRollups(self.rollups.retention_minutes, self.rollups.max_clients)
+        rollups.total = self._query("SELECT COUNT(*) FROM audit")[0][0]
+        if not rollups.total:
+            return rollups
+        rollups.by_client = Counter(dict(self._query(
+            "SELECT client_id, COUNT(*) AS n FROM audit GROUP BY client_id ORDER BY n DESC LIMIT ?",
+            (rollups.max_clients,),
+        )))
+        rollups.other_clients = rollups.total - rollups.by_client.total()
+        rollups.by_route = Counter(dict(self._query("SELECT route, COUNT(*) FROM audit GROUP BY route")))
+
+        latest = self._query("SELECT MAX(ts) FROM audit")[0][0]
+        since = (int(latest // 60) - rollups.retention_minutes + 1) * 60
+        recent = self._query(
+            "SELECT CAST(ts / 60 AS INTEGER) AS minute, client_id, COUNT(*) FROM audit "
+            "WHERE ts >= ? GROUP BY minute, client_id ORDER BY minute",
+            (since,),
+        )
+        for minute, client_id, count in recent:
+            rollups.add_minute(minute, client_id, count)
+        return rollups
+
+    async def query_records(
+        self,
+        client_id: str | None = None,
+        url: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Registros más recientes que cumplen los filtros (usa los índices por cliente/URL).
+        """
+        conditions, params = [], []
+        if client_id is not None:
+            conditions.append("client_id = ?")
+            params.append(client_id)
+        if url is not None:
+            conditions.append("url = ?")
+            params.append(url)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = await asyncio.to_thread(
+            self._query,
+            f"SELECT client_id, url, route, ts, latency_ms, status FROM audit {where} ORDER BY ts DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [
+            {"client_id": c, "url": u, "route": r, "ts": ts, "latency_ms": latency, "status": status}
+            for c, u, r, ts, latency, status in rows
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.rollups.total,
+            "clients": len(self.rollups.by_client),
+            "other_clients_records": self.rollups.other_clients,
+            "routes": len(self.rollups.by_route),
+            "rollup_minutes": len(self.rollups.per_minute),
+            **super().stats(),
+        }
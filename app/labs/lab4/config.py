@@ -0,0 +1,28 @@
+import os
+from dotenv import load_dotenv
+
+# Cargar variables desde el .env en root
+load_dotenv()
+
+class Lab4Config:
+    """Configuración centralizada para Lab4"""
+
+    # Log de auditoría en JSONL (escritura asíncrona por lotes)
+    AUDIT_LOG_PATH: str = os.getenv("AUDIT_LOG_PATH", "logs/audit.jsonl")
+    AUDIT_LOG_SAMPLE_RATE: float = float(os.getenv("AUDIT_LOG_SAMPLE_RATE", 1.0))
+    AUDIT_LOG_MAX_QUEUE: int = int(os.getenv("AUDIT_LOG_MAX_QUEUE", 10000))
+    AUDIT_LOG_BATCH_SIZE: int = int(os.getenv("AUDIT_LOG_BATCH_SIZE", 500))
+    AUDIT_LOG_FLUSH_MS: float = float(os.getenv("AUDIT_LOG_FLUSH_MS", 1000))
+    AUDIT_LOG_MAX_BYTES: int = int(os.getenv("AUDIT_LOG_MAX_BYTES", 10 * 1024 * 1024))
+    AUDIT_LOG_BACKUP_COUNT: int = int(os.getenv("AUDIT_LOG_BACKUP_COUNT", 5))
+
+    # Almacén de auditoría consultable (SQLite WAL + agregados en memoria)
+    AUDIT_DB_PATH: str = os.getenv("AUDIT_DB_PATH", "data/audit.sqlite3")
+    AUDIT_DB_MAX_QUEUE: int = int(os.getenv("AUDIT_DB_MAX_QUEUE", 100000))
+    AUDIT_DB_BATCH_SIZE: int = int(os.getenv("AUDIT_DB_BATCH_SIZE", 5000))
+    AUDIT_DB_FLUSH_MS: float = float(os.getenv("AUDIT_DB_FLUSH_MS", 500))
+    AUDIT_ROLLUP_RETENTION_MINUTES: int = int(os.getenv("AUDIT_ROLLUP_RETENTION_MINUTES", 1440))
+    # Clientes distintos que se guardan en los agregados (el resto se suma en "otros")
+    AUDIT_ROLLUP_MAX_CLIENTS: int = int(os.getenv("AUDIT_ROLLUP_MAX_CLIENTS", 10000))
+
+config = Lab4Config()
@@ -1,8 +1,10 @@
+import time
 from fastapi import Depends, Header, Request, HTTPException
+from fastapi.exceptions import RequestValidationError
 from .services import AuditService
 
 
-def get_client_id(
+async def get_client_id(
     x_client_id: str = Header(..., description="ID del cliente")
 ) -> str:
     """
@@ -11,7 +13,7 @@ def get_client_id(
     return x_client_id
 
 
-def get_audit_service(
+async def get_audit_service(
     client_id: str = Depends(get_client_id)
 ) -> AuditService:
     """
@@ -20,21 +22,39 @@ def get_audit_service(
     return AuditService(client_id)
 
 
-def audit_dependency(
+async def audit_dependency(
     request: Request,
     service: AuditService = Depends(get_audit_service)
 ):
     """
     🔥 Dependency GLOBAL
     Se ejecuta en TODAS las rutas del router.
-    """
-
-    # Ejemplo validación global
-    if service.client_id == "blocked-client":
-        raise HTTPException(
-            status_code=403,
-            detail="Cliente bloqueado"
-        )
 
-    # Auditoría global
-    service.register_access(str(request.url))
+    Es async (no ocupa el threadpool) y con yield: el registro se hace al
+    terminar la ruta para incluir su latencia y su status, también si la
+    ruta falla (HTTPException, error de validación o excepción no controlada).
+    """
+    started_at = time.perf_counter()
+    route = request.scope.get("route")
+    status = getattr(route, "status_code", None) or 200
+    try:
+        # Ejemplo validación global (también queda auditada)
+        if service.client_id == "blocked-client":
+            raise HTTPException(
+                status_code=403,
+                detail="Cliente bloqueado"
+            )
+
+        yield
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    except RequestValidationError:
+        status = 422
+        raise
+    except Exception:
+        status = 500
+        raise
+    finally:
+        # Auditoría global
+        service.register_access(str(request.url), started_at, status)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
 from .dependencies import audit_dependency
+from .services import audit_log, audit_store
 
 router = APIRouter(
     prefix="/lab4",
@@ -25,3 +27,64 @@ def get_orders():
         {"id": 1, "total": 150},
         {"id": 2, "total": 300}
     ]
+
+
+@router.get("/audit/stats")
+def get_audit_stats():
+    """
+    Estado del log de auditoría y del almacén: registros escritos, descartados, rotaciones...
+    """
+    return {"log": audit_log.stats(), "store": audit_store.stats()}
+
+
+def _epoch(value: datetime | None) -> float | None:
+    return value.timestamp() if value is not None else None
+
+
+@router.get("/audit/records")
+async def get_audit_records(
+    client_id: str | None = None,
+    url: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Registros de auditoría más recientes por cliente, URL y rango de tiempo (consulta indexada en SQLite).
+    """
+    return await audit_store.query_records(client_id, url, _epoch(since), _epoch(until), limit)
+
+
+@router.get("/audit/top-clients")
+async def get_audit_top_clients(
+    n: int = Query(10, ge=1, le=1000),
+    since: datetime | None = None,
+    until: datetime | None = None
+):
+    """
+    Top-N clientes por número de accesos (desde los agregados en memoria).
+    """
+    top = audit_store.rollups.top_clients(n, _epoch(since), _epoch(until))
+    return [{"client_id": client_id, "count": count} for client_id, count in top]
+
+
+@router.get("/audit/routes")
+async def get_audit_route_counts():
+    """
+    Número de accesos por ruta (desde los agregados en memoria).
+    """
+    return audit_store.rollups.route_counts()
+
+
+@router.get("/audit/timeline")
+async def get_audit_timeline(
+    since: datetime | None = None,
+    until: datetime | None = None
+):
+    """
+    Accesos por minuto en un rango de tiempo (desde los agregados en memoria).
+    """
+    return [
+        {"minute": datetime.fromtimestamp(minute).astimezone().isoformat(), "count": count}
+        for minute, count in audit_store.rollups.timeline(_epoch(since), _epoch(until))
+    ]
@@ -1,15 +1,63 @@
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from app.batch_writer import JSONLWriter
+from .audit_store import AuditStore
+from .config import config
+
+# Log de auditoría compartido: se arranca y se cierra en el lifespan de la app
+audit_log = JSONLWriter(
+    config.AUDIT_LOG_PATH,
+    sample_rate=config.AUDIT_LOG_SAMPLE_RATE,
+    max_queue=config.AUDIT_LOG_MAX_QUEUE,
+    batch_size=config.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=config.AUDIT_LOG_FLUSH_MS / 1000,
+    max_bytes=config.AUDIT_LOG_MAX_BYTES,
+    backup_count=config.AUDIT_LOG_BACKUP_COUNT,
+)
+
+# Almacén consultable: SQLite en modo WAL + rollups por cliente/ruta/minuto
+audit_store = AuditStore(
+    config.AUDIT_DB_PATH,
+    max_queue=config.AUDIT_DB_MAX_QUEUE,
+    batch_size=config.AUDIT_DB_BATCH_SIZE,
+    flush_interval=config.AUDIT_DB_FLUSH_MS / 1000,
+    retention_minutes=config.AUDIT_ROLLUP_RETENTION_MINUTES,
+    max_clients=config.AUDIT_ROLLUP_MAX_CLIENTS,
+)
+
 
 class AuditService:
     """
     Servicio de auditoría.
-    Simula registro de accesos.
+    Registra los accesos en el log JSONL sin bloquear la request.
     """
 
     def __init__(self, client_id: str):
         self.client_id = client_id
 
-    def register_access(self, url: str):
+    def register_access(self, url: str, started_at: float, status: int | None = None):
         """
-        Simula guardar log de auditoría.
+        Encola el registro de auditoría (client_id, url, timestamp, latencia, status)
+        en el log JSONL y en el almacén consultable.
+
+        :param started_at: time.perf_counter() al empezar la request.
+        :param status: status HTTP de la respuesta (500 si la ruta lanzó una excepción no controlada).
         """
-        print(f"[AUDIT] Cliente={self.client_id} accedió a {url}")
+        now = datetime.now(timezone.utc)
+        latency_ms = round((time.perf_counter() - started_at) * 1000, 3)
+        audit_log.log({
+            "client_id": self.client_id,
+            "url": url,
+            "timestamp": now.isoformat(),
+            "latency_ms": latency_ms,
+            "status": status,
+        })
+        audit_store.log({
+            "client_id": self.client_id,
+            "url": url,
+            "route": urlparse(url).path,
+            "ts": now.timestamp(),
+            "latency_ms": latency_ms,
+            "status": status,
+        })
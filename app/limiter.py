@@ -0,0 +1,197 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from fastapi import HTTPException
+
+
+class AdaptiveLimiter:
+    """
+    Limitador de concurrencia adaptativo (AIMD) con cola de espera acotada.
+
+    - Si las llamadas terminan por debajo de `target_latency` y el límite se
+      está usando, el límite crece +1 por "ventana" (incremento aditivo).
+    - Si una llamada tarda más o falla, el límite se multiplica por `backoff`
+      como mucho una vez por latencia media (decremento multiplicativo).
+    - Cuando no hay hueco se espera en una cola de `max_queue` plazas; con la
+      cola llena se responde 429 al instante y si la espera supera `max_wait`
+      se responde 503, ambos con cabecera Retry-After.
+    - Las peticiones en bloque pasan `admit()` una vez (429 si la cola está
+      llena) y sus items esperan hueco con `slot(wait=True)` sin `max_wait` y
+      sin contar para `max_queue` (ya los acota la concurrencia de cada
+      petición): la petición entera se acepta o se rechaza, nunca items sueltos.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        max_queue: int = 100,
+        max_wait: float = 10.0,
+        target_latency: float = 5.0,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Esperas de items en bloque (slot(wait=True)) dentro de _waiters
+        self._bulk_waiting = 0
+        self._avg_latency = target_latency / 2
+        self._last_decrease = 0.0
+        self.accepted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self, wait: bool = False) -> AsyncIterator[None]:
+        """
+        Reserva un hueco durante el bloque `async with` y ajusta el límite con su latencia.
+
+        :param wait: Esperar el hueco lo que haga falta (items de una petición ya admitida).
+        """
+        await self._acquire(wait)
+        start = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Cliente desconectado: no dice nada sobre la salud del proveedor
+            self._release(time.perf_counter() - start, ok=None)
+            raise
+        except BaseException:
+            self._release(time.perf_counter() - start, ok=False)
+            raise
+        else:
+            self._release(time.perf_counter() - start, ok=True)
+
+    def retry_after(self) -> int:
+        """
+        Segundos estimados hasta que haya hueco (para la cabecera Retry-After).
+        """
+        pending = len(self._waiters) + 1
+        return max(1, math.ceil(self._avg_latency * pending / max(int(self.limit), 1)))
+
+    def admit(self):
+        """
+        Admisión de una petición en bloque: 429 con Retry-After si la cola ya está llena.
+        """
+        if self._queued() >= self.max_queue:
+            self._reject_queue_full()
+
+    def _queued(self) -> int:
+        return len(self._waiters) - self._bulk_waiting
+
+    def _reject_queue_full(self):
+        self.rejected_queue_full += 1
+        raise HTTPException(
+            status_code=429,
+            detail=f"Demasiadas peticiones en cola para {self.name}",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    async def _acquire(self, wait: bool = False):
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self.accepted += 1
+            return
+
+        if not wait and self._queued() >= self.max_queue:
+            self._reject_queue_full()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._bulk_waiting += wait
+        try:
+            await asyncio.wait_for(future, None if wait else self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            if future.done() and not future.cancelled():
+                # El hueco llegó a concederse justo a la vez: se devuelve
+                self.inflight -= 1
+                self._wake()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Servicio saturado: tiempo de espera agotado en {self.name}",
+                headers={"Retry-After": str(self.retry_after())},
+            )
+        finally:
+            self._bulk_waiting -= wait
+        self.accepted += 1
+
+    def _release(self, latency: float, ok: bool | None):
+        self.inflight -= 1
+        if ok is not None:
+            self._adjust(latency, ok)
+        self._wake()
+
+    def _adjust(self, latency: float, ok: bool):
+        self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+        if not ok or latency > self.target_latency:
+            now = time.monotonic()
+            # Un solo recorte por ventana para no desplomar el límite con una ráfaga de lentas
+            if now - self._last_decrease >= self._avg_latency:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.inflight + 1 >= self.limit / 2:
+            # Solo crece si el límite se está usando de verdad
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def _wake(self):
+        while self._waiters and self.inflight < int(self.limit):
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.inflight += 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "queued_bulk": self._bulk_waiting,
+            "max_queue": self.max_queue,
+            "avg_latency_seconds": round(self._avg_latency, 4),
+            "target_latency_seconds": self.target_latency,
+            "accepted": self.accepted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class LimiterRegistry:
+    """
+    Un AdaptiveLimiter por ruta, creado bajo demanda con la config por defecto
+    más los overrides de esa ruta.
+    """
+
+    def __init__(self, defaults: dict | None = None, overrides: dict[str, dict] | None = None):
+        self.defaults = defaults or {}
+        self.overrides = overrides or {}
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+
+    def get(self, route: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(route)
+        if limiter is None:
+            params = {**self.defaults, **self.overrides.get(route, {})}
+            limiter = self._limiters.setdefault(route, AdaptiveLimiter(route, **params))
+        return limiter
+
+    def stats(self) -> dict:
+        return {route: limiter.stats() for route, limiter in self._limiters.items()}
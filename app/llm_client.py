@@ -1,10 +1,22 @@
+import json
+from typing import Callable
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel
+from .limiter import LimiterRegistry
+from .llm_metrics import llm_metrics
+from .singleflight import SingleFlight
 from .utils import get_env
 from config_base import (
     GOOGLE_LLM_MODEL
 )
 
-GOOGLEAI_API_KEY = get_env("GOOGLEAI_API_KEY")
+# Opcional si se usa el backend "fake"; llm_chain_google valida que exista
+GOOGLEAI_API_KEY = get_env("GOOGLEAI_API_KEY", "")
+
+# Backend LLM: "google" (Gemini real) | "fake" (local, para pruebas de carga sin red)
+LLM_BACKEND = get_env("LLM_BACKEND", "google")
 
 # Devuelve un objeto ChatGoogleGenerativeAI configurado para Google Generative AI. Compatible con LLMChain, RouterChain, MultiPromptChain, agentes, etc.
 # ---------- Google ----------
@@ -23,3 +35,134 @@ def llm_chain_google(model: str | None = None, temperature: float = 0.7,) -> Cha
         return ChatGoogleGenerativeAI(model=model_to_use, **llm_params)
     except Exception as e:
         raise RuntimeError(f"No se pudo inicializar el modelo Google '{model_to_use}'.") from e
+
+
+# ---------- Fake (local) ----------
+def llm_chain_fake(model: str | None = None, temperature: float = 0.7,) -> BaseChatModel:
+    # Import diferido: solo se carga si se selecciona este backend
+    from .fake_llm import FakeChatModel
+
+    return FakeChatModel(model=model or GOOGLE_LLM_MODEL, temperature=temperature)
+
+
+LLM_BACKENDS: dict[str, Callable[[str | None, float], BaseChatModel]] = {
+    "google": llm_chain_google,
+    "fake": llm_chain_fake,
+}
+
+
+def create_llm(model: str | None = None, temperature: float = 0.7, backend: str | None = None) -> BaseChatModel:
+    """
+    Crea un chat model del backend indicado (por defecto LLM_BACKEND).
+    """
+    backend = backend or LLM_BACKEND
+    factory = LLM_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Backend LLM desconocido: '{backend}'. Opciones: {', '.join(LLM_BACKENDS)}")
+    return factory(model, temperature)
+
+
+# =============================
+# Registro de clientes LLM reutilizables
+# =============================
+
+class LLMRegistry:
+    """
+    Registro de clientes LLM compartido por todo el proceso.
+
+    Crear un ChatGoogleGenerativeAI (cliente SDK, transporte, conversión del
+    schema en with_structured_output) cuesta decenas de ms, así que se crea
+    una sola vez por (model, temperature) y se reutiliza en cada request.
+    """
+
+    def __init__(self, backend: str = LLM_BACKEND):
+        self.backend = backend
+        self._llms: dict[tuple[str, float], BaseChatModel] = {}
+        self._structured: dict[tuple[str, float, type], Runnable] = {}
+        # La clave incluye id(prompt); el prompt se guarda junto a la chain para que el id no se reutilice
+        self._chains: dict[tuple[int, str, float, type], tuple[object, Runnable]] = {}
+
+    def get_llm(self, model: str | None = None, temperature: float = 0.7) -> BaseChatModel:
+        """
+        Devuelve el cliente para (model, temperature), creándolo la primera vez.
+        """
+        key = (model or GOOGLE_LLM_MODEL, temperature)
+        llm = self._llms.get(key)
+        if llm is None:
+            llm = create_llm(*key, backend=self.backend)
+            # Todas las llamadas de los clientes del registro quedan instrumentadas
+            llm.callbacks = [*(llm.callbacks or []), llm_metrics]
+            llm = self._llms.setdefault(key, llm)
+        return llm
+
+    def get_structured(
+        self,
+        schema: type[BaseModel],
+        model: str | None = None,
+        temperature: float = 0.7,
+    ) -> Runnable:
+        """
+        Devuelve el runnable `llm.with_structured_output(schema)` cacheado.
+        """
+        key = (model or GOOGLE_LLM_MODEL, temperature, schema)
+        runnable = self._structured.get(key)
+        if runnable is None:
+            llm = self.get_llm(model, temperature)
+            runnable = self._structured.setdefault(key, llm.with_structured_output(schema))
+        return runnable
+
+    def get_chain(
+        self,
+        prompt: Runnable,
+        schema: type[BaseModel],
+        model: str | None = None,
+        temperature: float = 0.7,
+    ) -> Runnable:
+        """
+        Devuelve la chain `prompt | llm.with_structured_output(schema)` cacheada.
+        """
+        key = (id(prompt), model or GOOGLE_LLM_MODEL, temperature, schema)
+        entry = self._chains.get(key)
+        if entry is None:
+            chain = prompt | self.get_structured(schema, model, temperature)
+            entry = self._chains.setdefault(key, (prompt, chain))
+        return entry[1]
+
+    def set_backend(self, backend: str):
+        """
+        Cambia de backend descartando los clientes ya creados.
+        """
+        if backend not in LLM_BACKENDS:
+            raise ValueError(f"Backend LLM desconocido: '{backend}'. Opciones: {', '.join(LLM_BACKENDS)}")
+        self.backend = backend
+        self.clear()
+
+    def clear(self):
+        """
+        Libera todos los clientes (se usa al apagar la aplicación).
+        """
+        self._chains.clear()
+        self._structured.clear()
+        self._llms.clear()
+
+
+llm_registry = LLMRegistry()
+
+
+# Coalescencia de prompts idénticos en curso (lab1 y /test-llm-google)
+llm_singleflight = SingleFlight()
+
+
+# Limitador de concurrencia adaptativo por ruta para las llamadas LLM.
+# LLM_LIMITS_PER_ROUTE admite overrides en JSON, p.ej. {"/lab1/query-batch": {"max_limit": 16}}
+llm_limiters = LimiterRegistry(
+    defaults={
+        "initial_limit": int(get_env("LLM_LIMIT_INITIAL", "8")),
+        "min_limit": int(get_env("LLM_LIMIT_MIN", "1")),
+        "max_limit": int(get_env("LLM_LIMIT_MAX", "64")),
+        "max_queue": int(get_env("LLM_LIMIT_MAX_QUEUE", "100")),
+        "max_wait": float(get_env("LLM_LIMIT_MAX_WAIT_SECONDS", "10")),
+        "target_latency": float(get_env("LLM_LIMIT_TARGET_LATENCY_SECONDS", "5")),
+    },
+    overrides=json.loads(get_env("LLM_LIMITS_PER_ROUTE", "{}")),
+)
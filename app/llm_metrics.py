@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from .metrics import Histogram, LATENCY_BUCKETS
+
+# Buckets para tamaños de prompt/respuesta (caracteres o tokens)
+TEXT_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Aproximación cuando el proveedor no informa de tokens (≈ 4 caracteres por token)
+CHARS_PER_TOKEN = 4
+
+
+def llm_call_config(route: str, queued_at: float | None = None) -> dict:
+    """
+    Config de LangChain para una llamada LLM: ruta de origen y momento en que
+    la petición empezó a esperar (para medir el tiempo en cola).
+    """
+    return {
+        "metadata": {
+            "route": route,
+            "queued_at": time.perf_counter() if queued_at is None else queued_at,
+        }
+    }
+
+
+class RouteLLMStats:
+    """
+    Métricas agregadas de las llamadas LLM de una ruta.
+    """
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queue_time = Histogram(LATENCY_BUCKETS)
+        self.prompt_chars = Histogram(TEXT_BUCKETS)
+        self.prompt_tokens = Histogram(TEXT_BUCKETS)
+        self.output_tokens = Histogram(TEXT_BUCKETS)
+        self.outcomes: dict[str, int] = defaultdict(int)
+        self.models: dict[str, int] = defaultdict(int)
+        self.estimated_tokens = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "outcomes": dict(self.outcomes),
+            "models": dict(self.models),
+            "latency_seconds": self.latency.snapshot(),
+            "queue_time_seconds": self.queue_time.snapshot(),
+            "prompt_chars": self.prompt_chars.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "output_tokens": self.output_tokens.snapshot(),
+            "calls_with_estimated_tokens": self.estimated_tokens,
+        }
+
+
+class LLMInstrumentation(BaseCallbackHandler):
+    """
+    Callback de LangChain que mide cada llamada a un chat model.
+
+    Se registra en todos los clientes del `llm_registry`, así que cubre
+    ainvoke, abatch (una medición por elemento) y astream. Registra latencia,
+    tiempo en cola, tamaño del prompt, tokens de entrada/salida (de
+    `usage_metadata` si el proveedor los informa), modelo y resultado.
+    """
+
+    # Se ejecuta en línea en el event loop: solo hace sumas y no bloquea
+    run_inline = True
+
+    def __init__(self):
+        self.routes: dict[str, RouteLLMStats] = defaultdict(RouteLLMStats)
+        # run_id -> (ruta, modelo, inicio, caracteres del prompt)
+        self._runs: dict[UUID, tuple[str, str, float, int]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ):
+        now = time.perf_counter()
+        metadata = metadata or {}
+        route = metadata.get("route", "unknown")
+        model = metadata.get("ls_model_name") or (serialized or {}).get("kwargs", {}).get("model", "unknown")
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+
+        stats = self.routes[route]
+        queued_at = metadata.get("queued_at")
+        if queued_at is not None:
+            stats.queue_time.observe(max(0.0, now - queued_at))
+        stats.prompt_chars.observe(chars)
+        self._runs[run_id] = (route, model, now, chars)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        route, model, start, chars = run
+        stats = self.routes[route]
+        stats.latency.observe(time.perf_counter() - start)
+        stats.outcomes["ok"] += 1
+
+        usage = _usage(response)
+        model = _model_name(response) or model
+        stats.models[model] += 1
+        if usage:
+            stats.prompt_tokens.observe(usage.get("input_tokens", 0))
+            stats.output_tokens.observe(usage.get("output_tokens", 0))
+        else:
+            stats.estimated_tokens += 1
+            stats.prompt_tokens.observe(chars / CHARS_PER_TOKEN)
+            output_chars = sum(len(g.text) for batch in response.generations for g in batch)
+            stats.output_tokens.observe(output_chars / CHARS_PER_TOKEN)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        route, model, start, _ = run
+        stats = self.routes[route]
+        stats.latency.observe(time.perf_counter() - start)
+        stats.models[model] += 1
+        outcome = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+        stats.outcomes[outcome] += 1
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._runs),
+            "routes": {route: stats.snapshot() for route, stats in self.routes.items()},
+        }
+
+
+def _usage(response: LLMResult) -> dict | None:
+    for batch in response.generations:
+        for generation in batch:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage
+    token_usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage_metadata")
+    if token_usage:
+        return {
+            "input_tokens": token_usage.get("input_tokens", token_usage.get("prompt_tokens", 0)),
+            "output_tokens": token_usage.get("output_tokens", token_usage.get("completion_tokens", 0)),
+        }
+    return None
+
+
+def _model_name(response: LLMResult) -> str | None:
+    for batch in response.generations:
+        for generation in batch:
+            metadata = getattr(getattr(generation, "message", None), "response_metadata", None) or {}
+            if metadata.get("model_name"):
+                return metadata["model_name"]
+    return None
+
+
+llm_metrics = LLMInstrumentation()
@@ -1,6 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .routes import router
 from .utils import get_env
+from .llm_client import llm_registry
+from .http_client import start_http_client, close_http_client
+from .jobs import job_queue
+from .database import database
+from .labs.lab1.services import warmup_intent_llm, close_lab1_batchers
+from .labs.lab2.services import init_user_service
+from .labs.lab4.services import audit_log, audit_store
 
 ENV = get_env("ENV", "dev")  # dev | prod
 
@@ -8,6 +16,39 @@ docs_url = "/docs" if ENV == "dev" else None
 redoc_url = "/redoc" if ENV == "dev" else None
 openapi_url = "/openapi.json" if ENV == "dev" else None
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la app: crea los recursos compartidos al arrancar y los libera al apagar.
+    """
+    # Clientes LLM creados una sola vez por proceso
+    llm_registry.get_llm()
+    warmup_intent_llm()
+    # Pool de conexiones HTTP salientes compartido
+    await start_http_client()
+    # Engine SQL con pool de conexiones compartido
+    await database.start()
+    await init_user_service()
+    # Cola de trabajos en segundo plano (retoma los pendientes de SQLite)
+    await job_queue.start()
+    # Escritura asíncrona del log de auditoría de lab4
+    await audit_log.start()
+    await audit_store.start()
+
+    yield
+
+    # Los lotes pendientes de lab1 se vacían antes: las notificaciones acaban en la cola de trabajos
+    await close_lab1_batchers()
+    # Después se drenan los trabajos en curso: pueden usar el cliente HTTP
+    await job_queue.close()
+    await close_http_client()
+    await audit_log.close()
+    await audit_store.close()
+    await database.close()
+    llm_registry.clear()
+
+
 app = FastAPI(
     title="Lab FastAPI",
     description="""
@@ -18,6 +59,7 @@ app = FastAPI(
     docs_url=docs_url,
     redoc_url=redoc_url,
     openapi_url=openapi_url,
+    lifespan=lifespan,
 )
 
 app.include_router(router)
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Callable, Hashable
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class TokenBucketLimiter:
+    """
+    Rate limiter por clave (p.ej. API key) con token bucket.
+
+    - Cada clave tiene un bucket de `limit` tokens que se rellena de forma
+      continua a `limit / window` tokens por segundo; cada request gasta uno.
+      Coste O(1) por request y ráfagas de hasta `limit`.
+    - Los buckets se reparten en `shards` dicts, cada uno con su lock: hilos
+      con claves distintas casi nunca compiten por el mismo lock.
+    - Un bucket sin uso durante `idle_ttl` (>= window) ya estaría lleno, así que
+      borrarlo no cambia nada: cada shard se barre como mucho una vez por
+      `idle_ttl`, desde las propias requests, y la memoria queda acotada a las
+      claves activas.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        shards: int = 64,
+        idle_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if shards <= 0:
+            raise ValueError("shards debe ser mayor que 0")
+        self.window = window
+        self.idle_ttl = max(idle_ttl or window, window)
+        self._clock = clock
+        self._shards: list[dict[Hashable, _Bucket]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        now = clock()
+        self._next_sweep = [now + self.idle_ttl] * shards
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def hit(self, key: Hashable, limit: int, cost: float = 1.0) -> tuple[bool, float, float]:
+        """
+        Gasta `cost` tokens del bucket de `key`.
+
+        Devuelve (permitido, tokens restantes, segundos hasta poder repetir);
+        el último es 0 si se ha permitido.
+        """
+        index = hash(key) % len(self._shards)
+        rate = limit / self.window
+        now = self._clock()
+        with self._locks[index]:
+            shard = self._shards[index]
+            if now >= self._next_sweep[index]:
+                self._sweep(shard, now)
+                self._next_sweep[index] = now + self.idle_ttl
+            bucket = shard.get(key)
+            if bucket is None:
+                bucket = shard[key] = _Bucket(limit, now)
+            else:
+                bucket.tokens = min(limit, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                self.allowed += 1
+                return True, bucket.tokens, 0.0
+            self.rejected += 1
+            return False, bucket.tokens, (cost - bucket.tokens) / rate
+
+    def _sweep(self, shard: dict[Hashable, _Bucket], now: float):
+        idle = [key for key, bucket in shard.items() if now - bucket.updated >= self.idle_ttl]
+        for key in idle:
+            del shard[key]
+        self.evicted += len(idle)
+
+    def evict_idle(self) -> int:
+        """
+        Barre todos los shards ya (normalmente no hace falta: se barren solos).
+        """
+        before = self.evicted
+        now = self._clock()
+        for index, shard in enumerate(self._shards):
+            with self._locks[index]:
+                self._sweep(shard, now)
+                self._next_sweep[index] = now + self.idle_ttl
+        return self.evicted - before
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self),
+            "shards": len(self._shards),
+            "window_seconds": self.window,
+            "idle_ttl_seconds": self.idle_ttl,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
@@ -1,5 +1,9 @@
-from fastapi import APIRouter
-from .llm_client import llm_chain_google
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException
+from .llm_client import llm_registry, llm_singleflight, llm_limiters
+from .llm_metrics import llm_call_config, llm_metrics
+from .sse import sse_response
+from .jobs import job_queue
 
 from .labs.lab1.router import router as lab1_router
 from .labs.lab2.router import router as lab2_router
@@ -16,12 +20,69 @@ router = APIRouter()
 def health():
     return {"status": "ok"}
 
+TEST_LLM_PROMPT = "Dime una frase corta para confirmar conexión."
+
 @router.get("/test-llm-google")
 async def test_llm_google():
-    llm = llm_chain_google()
-    answer = await llm.ainvoke("Dime una frase corta para confirmar conexión.")
+    llm = llm_registry.get_llm()
+
+    async def invoke():
+        async with llm_limiters.get("/test-llm-google").slot():
+            return await llm.ainvoke(TEST_LLM_PROMPT, config=llm_call_config("/test-llm-google"))
+
+    answer = await llm_singleflight.do(("test-llm-google", TEST_LLM_PROMPT), invoke)
     return {"response": answer.content}
 
+@router.get("/test-llm-google/stream")
+async def test_llm_google_stream():
+    """
+    Igual que /test-llm-google pero emite cada fragmento de texto por SSE (evento `token`).
+    """
+    llm = llm_registry.get_llm()
+
+    async def events():
+        try:
+            async with llm_limiters.get("/test-llm-google/stream").slot():
+                async with aclosing(llm.astream(TEST_LLM_PROMPT, config=llm_call_config("/test-llm-google/stream"))) as stream:
+                    async for chunk in stream:
+                        if chunk.content:
+                            yield "token", chunk.content
+            yield "done", {}
+        except HTTPException as e:
+            yield "error", {"error": e.detail, "status_code": e.status_code, "headers": e.headers}
+        except Exception as e:
+            yield "error", {"error": str(e)}
+
+    return sse_response(events())
+
+@router.get("/llm-stats")
+def llm_stats():
+    """
+    Métricas de las llamadas LLM compartidas por todos los labs.
+    """
+    return {
+        "calls": llm_metrics.stats(),
+        "singleflight": llm_singleflight.stats(),
+        "limiters": llm_limiters.stats(),
+    }
+
+@router.get("/jobs/stats")
+async def jobs_stats():
+    """
+    Estado de la cola de trabajos en segundo plano.
+    """
+    return await job_queue.stats()
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Estado y resultado de un trabajo (queued | running | done | failed).
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
 # --- Proyectos Laboratorio ---
 router.include_router(lab1_router)
 router.include_router(lab2_router)
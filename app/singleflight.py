@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas idénticas en curso ("single-flight").
+
+    Si ya hay una llamada en vuelo con la misma clave, el siguiente llamante
+    espera ese mismo resultado (o excepción) en vez de lanzar otra.
+    La llamada compartida está protegida con `asyncio.shield`: si un cliente
+    se desconecta solo se cancela su espera; la llamada se cancela únicamente
+    cuando ya no queda nadie esperándola.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.leaders = 0
+        self.saved = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta `fn()` una sola vez por clave mientras esté en curso.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.leaders += 1
+        else:
+            self.saved += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Este llamante se fue; si era el último, ya nadie necesita el resultado.
+            # Se saca del mapa al cancelarla: quien llegue mientras termina de
+            # cancelarse lanza una llamada nueva en vez de recibir el CancelledError
+            if self._calls.get(key) is task and self._waiters.get(key) == 1 and not task.done():
+                del self._calls[key]
+                del self._waiters[key]
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        # Marca la excepción como leída aunque todos los llamantes se hayan ido
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._calls),
+            "leader_calls": self.leaders,
+            "saved_calls": self.saved,
+        }
@@ -0,0 +1,38 @@
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # Evita que nginx acumule el stream en buffer
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: str | None = None) -> str:
+    """
+    Serializa un evento Server-Sent-Events. `data` se envía como JSON.
+    """
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+def sse_response(events: AsyncIterator[tuple[str, Any]]) -> StreamingResponse:
+    """
+    Convierte un generador async de (evento, datos) en una respuesta text/event-stream.
+
+    Starlette cancela el generador cuando el cliente se desconecta; `aclosing`
+    garantiza que el generador de origen (p.ej. `llm.astream`) se cierre en ese
+    momento y deje de consumir tokens. Como cada `yield` espera a que el envío
+    al cliente termine, un cliente lento frena también la lectura del modelo.
+    """
+    async def body():
+        async with aclosing(events) as stream:
+            async for event, data in stream:
+                yield format_sse(data, event)
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,122 @@
+"""
+Benchmark del almacén de auditoría de lab4 (SQLite WAL + rollups en memoria).
+
+Ingiere N registros sintéticos (por defecto 10M, repartidos en las últimas
+24 h entre miles de clientes con distribución sesgada) a través de
+`AuditStore.log`, igual que la dependencia de auditoría, y mide:
+
+- Ritmo de ingesta (registros/s) hasta que todo está escrito en SQLite.
+- Latencia de las consultas servidas desde las rollups (top-N, por ruta,
+  timeline) frente a la misma consulta con un GROUP BY sobre la tabla.
+- Latencia de la consulta indexada de registros por cliente y rango.
+
+Uso:
+    python -m benchmarks.audit_store                      # 10M registros
+    python -m benchmarks.audit_store --records 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.labs.lab4.audit_store import AuditStore  # noqa: E402
+from benchmarks.common import percentile  # noqa: E402
+
+ROUTES = [f"/lab4/resource-{i}" for i in range(20)]
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": percentile(samples, 50) * 1000, "p99_ms": percentile(samples, 99) * 1000}
+
+
+async def timed_async(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": percentile(samples, 50) * 1000, "p99_ms": percentile(samples, 99) * 1000}
+
+
+async def ingest(store: AuditStore, records: int, clients: int, now: float) -> float:
+    rng = random.Random(42)
+    client_ids = [f"client-{i}" for i in range(clients)]
+    span = 24 * 3600
+    start = time.perf_counter()
+    for i in range(records):
+        # Backpressure: si la cola está llena se cede el loop al escritor
+        while store.queued >= store._queue.maxsize:
+            await asyncio.sleep(0.001)
+        route = ROUTES[i % len(ROUTES)]
+        store.log({
+            "client_id": client_ids[int(rng.paretovariate(1.1)) % clients],
+            "url": f"http://api.local{route}",
+            "route": route,
+            "ts": now - span + span * i / records,
+            "latency_ms": 1.0,
+        })
+        if i % 100_000 == 0 and i:
+            print(f"  {i:>10,} registros encolados ({i / (time.perf_counter() - start):,.0f}/s)", end="\r")
+    await store.flush()
+    return time.perf_counter() - start
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit.sqlite3")
+        store = AuditStore(path, max_queue=200_000, batch_size=20_000, flush_interval=0.05)
+        await store.start()
+        now = time.time()
+
+        print(f"Ingestando {args.records:,} registros ({args.clients:,} clientes)...")
+        elapsed = await ingest(store, args.records, args.clients, now)
+        stats = store.stats()
+        print(f"\nIngesta: {stats['written']:,} registros en {elapsed:.1f} s -> {stats['written'] / elapsed:,.0f} registros/s "
+              f"(descartados: {stats['dropped']}, errores: {stats['write_errors']})")
+        print(f"Tamaño en disco: {os.path.getsize(path) / 1e6:,.0f} MB\n")
+
+        rollups = store.rollups
+        hot_client = rollups.top_clients(1)[0][0]
+        last_hour = now - 3600
+        scan = sqlite3.connect(path)
+
+        rows = [
+            ("top-10 clientes (rollup)", timed(lambda: rollups.top_clients(10), args.repeat)),
+            ("top-10 clientes (GROUP BY)", timed(lambda: scan.execute(
+                "SELECT client_id, COUNT(*) c FROM audit GROUP BY client_id ORDER BY c DESC LIMIT 10").fetchall(), 3)),
+            ("top-10 última hora (rollup)", timed(lambda: rollups.top_clients(10, last_hour, now), args.repeat)),
+            ("top-10 última hora (GROUP BY)", timed(lambda: scan.execute(
+                "SELECT client_id, COUNT(*) c FROM audit WHERE ts >= ? GROUP BY client_id ORDER BY c DESC LIMIT 10",
+                (last_hour,)).fetchall(), 3)),
+            ("conteo por ruta (rollup)", timed(rollups.route_counts, args.repeat)),
+            ("conteo por ruta (GROUP BY)", timed(lambda: scan.execute(
+                "SELECT route, COUNT(*) FROM audit GROUP BY route").fetchall(), 3)),
+            ("timeline 24h por minuto (rollup)", timed(lambda: rollups.timeline(now - 86400, now), args.repeat)),
+            ("registros cliente+rango (índice)", await timed_async(
+                lambda: store.query_records(client_id=hot_client, since=last_hour, until=now, limit=100), args.repeat)),
+        ]
+        scan.close()
+        await store.close()
+
+    print(f"{'consulta':<36}{'p50 ms':>12}{'p99 ms':>12}")
+    for name, r in rows:
+        print(f"{name:<36}{r['p50_ms']:>12.3f}{r['p99_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10_000_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""
+Utilidades compartidas por los benchmarks: carga concurrente y percentiles.
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    Percentil q (0-100) por interpolación lineal.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """
+    Lanza `requests` llamadas con `concurrency` en vuelo y devuelve latencias y throughput.
+
+    `call(i)` debe devolver True si la petición fue correcta.
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def print_table(rows: list[tuple[str, dict]]):
+    print(f"{'escenario':<34}{'req':>7}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in rows:
+        print(
+            f"{name:<34}{r['requests']:>7}{r['errors']:>6}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+        )
@@ -0,0 +1,155 @@
+"""
+Benchmark del cliente HTTP saliente: cliente nuevo por llamada vs pool compartido.
+
+Levanta un upstream local (uvicorn + HTTPS con certificado autofirmado) que
+responde al instante, así que la diferencia medida es el coste de abrir
+conexión TCP + handshake TLS en cada llamada frente a reutilizar conexiones
+keep-alive del pool de `app.http_client`.
+
+Uso:
+    python -m benchmarks.http_client --requests 1000 --concurrency 20
+    python -m benchmarks.http_client --plain   # sin TLS (solo handshake TCP)
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+from app.http_client import HTTPClientConfig, create_http_client  # noqa: E402
+from benchmarks.common import print_table, run_load  # noqa: E402
+
+
+async def upstream(scope, receive, send):
+    """
+    Upstream mínimo: responde un JSON pequeño a cualquier petición.
+    """
+    if scope["type"] != "http":
+        return
+    body = b'{"id": 1, "title": "ok"}'
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def self_signed_cert(directory: str) -> tuple[str, str]:
+    """
+    Genera un certificado autofirmado para 127.0.0.1 y devuelve (cert, key).
+    """
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return cert_path, key_path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_upstream(port: int, cert: str | None, key: str | None) -> uvicorn.Server:
+    config = uvicorn.Config(
+        upstream,
+        host="127.0.0.1",
+        port=port,
+        log_level="error",
+        ssl_certfile=cert,
+        ssl_keyfile=key,
+        timeout_keep_alive=60,
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        cert = key = None
+        if not args.plain:
+            cert, key = self_signed_cert(tmp)
+        port = free_port()
+        server = start_upstream(port, cert, key)
+        scheme = "http" if args.plain else "https"
+        url = f"{scheme}://127.0.0.1:{port}/posts/1"
+
+        verify: bool | ssl.SSLContext = True
+        if cert:
+            verify = ssl.create_default_context(cafile=cert)
+
+        async def per_request(i: int) -> bool:
+            # Patrón anterior: un AsyncClient (y una conexión nueva) por llamada
+            async with httpx.AsyncClient(verify=verify, timeout=10.0) as client:
+                response = await client.get(url)
+            return response.status_code == 200
+
+        config = HTTPClientConfig()
+        config.MAX_CONNECTIONS = max(config.MAX_CONNECTIONS, args.concurrency)
+        config.MAX_KEEPALIVE_CONNECTIONS = max(config.MAX_KEEPALIVE_CONNECTIONS, args.concurrency)
+        shared_client = create_http_client(config, verify=verify)
+
+        async def shared(i: int) -> bool:
+            response = await shared_client.get(url)
+            return response.status_code == 200
+
+        rows = []
+        try:
+            rows.append(("cliente nuevo por request", await run_load(per_request, args.requests, args.concurrency)))
+            rows.append(("cliente compartido (pool)", await run_load(shared, args.requests, args.concurrency)))
+        finally:
+            await shared_client.aclose()
+            server.should_exit = True
+
+    print(f"\nUpstream local {scheme.upper()} · {args.requests} requests · concurrencia {args.concurrency}\n")
+    print_table(rows)
+    base, pooled = rows[0][1], rows[1][1]
+    if pooled["p50_ms"]:
+        print(f"\nAhorro p50: {base['p50_ms'] - pooled['p50_ms']:.2f} ms por llamada ({base['p50_ms'] / pooled['p50_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--plain", action="store_true", help="upstream HTTP sin TLS")
+    asyncio.run(main(parser.parse_args()))
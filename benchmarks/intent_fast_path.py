@@ -0,0 +1,108 @@
+"""
+Benchmark: precisión y latencia del clasificador local de intenciones (fast-path).
+
+Evalúa `classify_intent` contra un corpus etiquetado. Para los mensajes que
+superan el umbral mide si action, title y due_date coinciden con la etiqueta;
+los que no lo superan irían al LLM.
+
+Uso:
+    python -m benchmarks.intent_fast_path
+"""
+
+import os
+import time
+from datetime import date
+
+os.environ.setdefault("GOOGLEAI_API_KEY", "bench-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.labs.lab1.classifier import classify_intent  # noqa: E402
+from app.labs.lab1.config import config  # noqa: E402
+
+TODAY = date(2026, 10, 14)  # miércoles
+
+# (mensaje, action, title, due_date)
+CORPUS = [
+    ("Crea una tarea llamada Preparar informe para mañana", "create_task", "Preparar informe", "2026-10-15"),
+    ("crea una tarea comprar pan pasado mañana", "create_task", "comprar pan", "2026-10-16"),
+    ("Añade la tarea \"Llamar a Juan\" el viernes", "create_task", "Llamar a Juan", "2026-10-16"),
+    ("recuérdame pagar la luz el 20/10", "create_task", "pagar la luz", "2026-10-20"),
+    ("Crea tarea: Enviar factura el 3 de noviembre", "create_task", "Enviar factura", "2026-11-03"),
+    ("crea una tarea revisar código hoy", "create_task", "revisar código", "2026-10-14"),
+    ("apunta estudiar en 3 días", "create_task", "estudiar", "2026-10-17"),
+    ("crea una tarea de limpiar la casa 2026-12-01", "create_task", "limpiar la casa", "2026-12-01"),
+    ("Agrega una tarea titulada Renovar DNI para el lunes", "create_task", "Renovar DNI", "2026-10-19"),
+    ("nueva tarea: reservar sala para el jueves", "create_task", "reservar sala", "2026-10-15"),
+    ("crea una tarea llamada Deploy", "create_task", "Deploy", None),
+    ("Crea una tarea llamada Preparar demo para manana", "create_task", "Preparar demo", "2026-10-15"),
+    ("crea la tarea «Comprar regalo» para el 24 de diciembre", "create_task", "Comprar regalo", "2026-12-24"),
+    ("programa una tarea backup para el 1/11/2026", "create_task", "backup", "2026-11-01"),
+    ("cambia la tarea revisar PR para el próximo lunes", "update_task", "revisar PR", "2026-10-19"),
+    ("mueve la tarea Informe anual a mañana", "update_task", "Informe anual", "2026-10-15"),
+    ("pospón la tarea \"Dentista\" al viernes", "update_task", "Dentista", "2026-10-16"),
+    ("marca la tarea comprar leche como hecha", "update_task", "comprar leche", None),
+    ("¿Cómo van mis tareas?", "get_status", None, None),
+    ("muéstrame las tareas pendientes", "get_status", None, None),
+    ("¿cuál es el estado de la tarea Informe?", "get_status", "Informe", None),
+    ("lista mis tareas de hoy", "get_status", None, "2026-10-14"),
+    # Mensajes que deberían ir al LLM (ambiguos o fuera de dominio)
+    ("crea una tarea para la semana que viene", "create_task", None, None),
+    ("crea una tarea X y crea otra Y", "create_task", None, None),
+    ("hola qué tal", "other", None, None),
+    ("actualiza el estado de la tarea informe", "update_task", "informe", None),
+    ("necesito acordarme de lo del banco", "create_task", "lo del banco", None),
+    ("¿me puedes ayudar con algo?", "other", None, None),
+    ("crea una tarea para el 31/02", "create_task", None, None),
+    ("crea una tarea informe para el lunes o el martes", "create_task", "informe", None),
+    # Adversariales: frases de campo/estado entre el verbo y el título, o sin título anclado
+    ("cambia la fecha de la tarea informe a mañana", "update_task", "informe", "2026-10-15"),
+    ("marca como completada la tarea informe", "update_task", "informe", None),
+    ("Crea una tarea en Madrid para mañana", "create_task", None, "2026-10-15"),
+    ("cambia la fecha del informe a mañana", "update_task", "informe", "2026-10-15"),
+    ("cambia el título de la tarea informe a resumen anual", "update_task", "informe", None),
+    ("crea una tarea para el viernes", "create_task", None, "2026-10-16"),
+    ("marca como hecha la compra", "update_task", "compra", None),
+    # Restos de fecha sin resolver (horas, rangos, días sueltos): al LLM
+    ("crea una tarea llamada revisar informe el 15 a las 9", "create_task", "revisar informe", "2026-10-15"),
+    ("crea una tarea llamada vacaciones del 1 al 15 de agosto", "create_task", "vacaciones", None),
+    ("crea una tarea llamada llamar al banco mañana a las 10:30", "create_task", "llamar al banco", "2026-10-15"),
+]
+
+
+def _matches(result, expected) -> bool:
+    _, action, title, due_date = expected
+    return (
+        result.action == action
+        and (result.title or "").casefold() == (title or "").casefold()
+        and result.due_date == due_date
+    )
+
+
+def main(iterations: int = 2000):
+    accepted = correct = 0
+    failures = []
+    for item in CORPUS:
+        result, confidence = classify_intent(item[0], TODAY)
+        if confidence >= config.INTENT_FAST_PATH_THRESHOLD:
+            accepted += 1
+            if _matches(result, item):
+                correct += 1
+            else:
+                failures.append((item[0], result.model_dump()))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message, *_ in CORPUS:
+            classify_intent(message, TODAY)
+    per_call = (time.perf_counter() - start) / (iterations * len(CORPUS)) * 1e6
+
+    print(f"Corpus: {len(CORPUS)} mensajes, umbral {config.INTENT_FAST_PATH_THRESHOLD}")
+    print(f"Cobertura fast-path: {accepted}/{len(CORPUS)} ({accepted / len(CORPUS):.0%})")
+    print(f"Precisión en aceptados: {correct}/{accepted} ({correct / accepted:.0%})" if accepted else "Sin aceptados")
+    print(f"Latencia media por clasificación: {per_call:.1f} µs")
+    for message, result in failures:
+        print(f"  ✗ {message!r} -> {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark de latencia y throughput de las rutas de intención de lab1.
+
+Usa el backend LLM "fake" (sin red) y un cliente ASGI en proceso, así que
+mide solo el coste del servidor: cache, batching, fast-path, serialización...
+La latencia del LLM simulado se configura con FAKE_LLM_* (ver app/fake_llm.py).
+
+Una request cuenta como error si no es 200 o si el cuerpo trae un error:
+`{"error": ...}` en /query y /query-chain, un evento SSE `error` (o ningún
+`result`) en /query-stream, y cualquier item con error en /query-batch (los
+items fallidos se cuentan además por separado).
+
+Las rutas con trabajos en segundo plano (/query-bg, /query-bg-external) solo
+miden el encolado: el trabajo lo ejecuta después la cola de app/jobs.py
+(en memoria durante el benchmark). La base de datos de la app y el log y el
+almacén de auditoría van a un directorio temporal.
+
+Fuera de alcance: /external, /github-analyze y /github-analyze-batch llaman a
+servicios reales por red (el pool HTTP se mide en benchmarks.http_client) y
+las rutas */stats solo devuelven contadores en memoria.
+
+Uso:
+    python -m benchmarks.lab1_routes --requests 500 --concurrency 50
+    python -m benchmarks.lab1_routes --repeat 20   # mensajes repetidos (cache caliente)
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+os.environ["LLM_BACKEND"] = "fake"
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "50")
+os.environ.setdefault("FAKE_LLM_SEED", "42")
+os.environ.setdefault("JOBS_DB_PATH", ":memory:")
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/bench.sqlite3"
+os.environ.setdefault("AUDIT_DB_PATH", os.path.join(_tmp.name, "audit.sqlite3"))
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(_tmp.name, "audit.jsonl"))
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.common import print_table, run_load  # noqa: E402
+
+ROUTES = ["/lab1/query", "/lab1/query-chain", "/lab1/query-stream", "/lab1/query-batch"]
+BACKGROUND_ROUTES = ["/lab1/query-bg", "/lab1/query-bg-external"]
+
+
+def message(route: str, i: int, repeat: int) -> str:
+    # Mensajes libres: no los resuelve el fast-path, así que llegan al LLM (o a la cache).
+    # Incluyen la ruta para que una ruta no caliente la cache de la siguiente.
+    n = i % repeat if repeat else i
+    return f"necesito que revises lo que hablamos en {route} sobre el asunto número {n}"
+
+
+def sse_events(text: str) -> list[str]:
+    """
+    Nombres de los eventos de un cuerpo text/event-stream.
+    """
+    return [
+        line[len("event:"):].strip()
+        for frame in text.split("\n\n")
+        for line in frame.splitlines()
+        if line.startswith("event:")
+    ]
+
+
+def check_response(route: str, response: httpx.Response, items: dict) -> bool:
+    """
+    True si la respuesta es correcta de principio a fin (no solo el status).
+    En /query-batch suma los items y los items con error en `items`.
+    """
+    if response.status_code != 200:
+        return False
+    if route == "/lab1/query-stream":
+        events = sse_events(response.text)
+        return "result" in events and "error" not in events
+    data = response.json()
+    if route == "/lab1/query-batch":
+        errors = sum(1 for item in data["results"] if item.get("error"))
+        items["total"] += len(data["results"])
+        items["errors"] += errors
+        return errors == 0
+    if route == "/lab1/query-bg" and "X-Job-Id" not in response.headers:
+        return False
+    return "error" not in data
+
+
+async def bench_route(client: httpx.AsyncClient, route: str, requests: int, concurrency: int, repeat: int) -> dict:
+    items = {"total": 0, "errors": 0}
+
+    async def call(i: int) -> bool:
+        if route == "/lab1/query-batch":
+            body = {"items": [{"message": message(route, i * 10 + j, repeat)} for j in range(10)]}
+        else:
+            body = {"message": message(route, i, repeat)}
+        response = await client.post(route, json=body)
+        return check_response(route, response, items)
+
+    result = await run_load(call, requests, concurrency)
+    if items["total"]:
+        result["items"] = items
+    return result
+
+
+async def main(args):
+    routes = ROUTES + (BACKGROUND_ROUTES if args.background else [])
+    rows = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for route in routes:
+                result = await bench_route(client, route, args.requests, args.concurrency, args.repeat)
+                rows.append((route, result))
+    print(f"Backend fake: latencia {os.environ['FAKE_LLM_LATENCY_MS']} ms, concurrencia {args.concurrency}")
+    print_table(rows)
+    for route, result in rows:
+        if "items" in result:
+            items = result["items"]
+            print(f"{route}: {items['errors']}/{items['total']} items con error")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=0, help="Nº de mensajes distintos (0 = todos distintos)")
+    parser.add_argument("--background", action="store_true", help="Incluir /query-bg y /query-bg-external")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,165 @@
+"""
+Benchmark del almacén de usuarios en memoria de lab2 (USERS_STORE=memory).
+
+Compara, con N usuarios (por defecto 1M):
+
+- Layout anterior: dict de dicts {id: {"id", "name", "email"}}, id nuevo con
+  `max(ids) + 1` y búsqueda por email recorriendo todos los usuarios.
+- InMemoryUserRepository: registros con `__slots__`, índices id -> registro
+  y email -> id, y asignación de id bajo lock.
+
+Mide memoria ocupada (tracemalloc), latencia de get por id, get por email y
+create, y comprueba que la creación concurrente desde hilos no repite ids.
+
+Uso:
+    python -m benchmarks.lab2_user_store
+    python -m benchmarks.lab2_user_store --users 200000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.labs.lab2.memory_store import InMemoryUserRepository  # noqa: E402
+from benchmarks.common import percentile  # noqa: E402
+
+
+class DictUserStore:
+    """
+    El almacenamiento que tenía UserService antes del repository (solo demo).
+    """
+
+    def __init__(self):
+        self.users: dict[int, dict] = {}
+
+    def add(self, name: str, email: str) -> dict:
+        new_id = max(self.users.keys(), default=0) + 1
+        user = {"id": new_id, "name": name, "email": email}
+        self.users[new_id] = user
+        return user
+
+    def load(self, users: list[tuple[str, str]]):
+        # Carga inicial sin max() por usuario (si no, construir 1M sería O(n²))
+        for i, (name, email) in enumerate(users, start=len(self.users) + 1):
+            self.users[i] = {"id": i, "name": name, "email": email}
+
+    async def get(self, user_id: int) -> dict | None:
+        return self.users.get(user_id)
+
+    async def get_by_email(self, email: str) -> dict | None:
+        for user in self.users.values():
+            if user["email"] == email:
+                return user
+        return None
+
+    async def create(self, name: str, email: str) -> dict:
+        return self.add(name, email)
+
+
+def synthetic_users(n: int, prefix: str) -> list[tuple[str, str]]:
+    return [(f"{prefix}user{i}", f"{prefix}user{i}@example.com") for i in range(n)]
+
+
+def build(store_cls, users: list[tuple[str, str]]):
+    """
+    Construye el almacén y devuelve (store, bytes ocupados, segundos).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    store = store_cls()
+    if isinstance(store, DictUserStore):
+        store.load(users)
+    else:
+        for name, email in users:
+            store.add(name, email)
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return store, used, elapsed
+
+
+async def timed(call, args: list) -> dict:
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        await call(*arg)
+        samples.append(time.perf_counter() - start)
+    return {"p50_us": percentile(samples, 50) * 1e6, "p99_us": percentile(samples, 99) * 1e6}
+
+
+def concurrent_creates(store: InMemoryUserRepository, threads: int, per_thread: int) -> bool:
+    ids: list[int] = []
+    ids_lock = threading.Lock()
+
+    def worker(t: int):
+        created = [store.add(f"t{t}-{i}", f"t{t}-{i}@example.com").id for i in range(per_thread)]
+        with ids_lock:
+            ids.extend(created)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return len(set(ids)) == threads * per_thread
+
+
+async def main(args):
+    rng = random.Random(42)
+    rows = []
+    for label, store_cls in (("dict de dicts", DictUserStore), ("__slots__ + índices", InMemoryUserRepository)):
+        # Los strings se crean antes de medir: tracemalloc cuenta solo la estructura de cada layout
+        store, used, elapsed = build(store_cls, synthetic_users(args.users, prefix=""))
+        ids = [(rng.randint(1, args.users),) for _ in range(args.lookups)]
+        emails = [(f"user{rng.randrange(args.users)}@example.com",) for _ in range(args.lookups)]
+        # La búsqueda por email del layout anterior es O(n): pocas muestras
+        scan_samples = emails if store_cls is InMemoryUserRepository else emails[:args.scans]
+        row = {
+            "mem_mb": used / 1e6,
+            "bytes_user": used / args.users,
+            "build_s": elapsed,
+            "get_id": await timed(store.get, ids),
+            "get_email": await timed(store.get_by_email, scan_samples),
+            "create": await timed(
+                store.create,
+                [(f"new{i}", f"new{i}@example.com") for i in range(args.scans)],
+            ),
+        }
+        rows.append((label, row))
+        del store
+
+    print(f"usuarios: {args.users}")
+    print(
+        f"{'layout':<22}{'MB':>9}{'B/usuario':>11}{'carga s':>9}"
+        f"{'id p50 µs':>11}{'email p50 µs':>14}{'email p99 µs':>14}{'create p50 µs':>15}"
+    )
+    for label, r in rows:
+        print(
+            f"{label:<22}{r['mem_mb']:>9.1f}{r['bytes_user']:>11.0f}{r['build_s']:>9.2f}"
+            f"{r['get_id']['p50_us']:>11.2f}{r['get_email']['p50_us']:>14.2f}"
+            f"{r['get_email']['p99_us']:>14.2f}{r['create']['p50_us']:>15.2f}"
+        )
+
+    store = InMemoryUserRepository()
+    ok = concurrent_creates(store, args.threads, args.per_thread)
+    print(
+        f"\ncreate concurrente: {args.threads} hilos x {args.per_thread} -> "
+        f"{len(store)} usuarios, ids únicos: {'sí' if ok else 'NO'}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000, help="muestras de get por id/email")
+    parser.add_argument("--scans", type=int, default=20, help="muestras de las operaciones O(n) del layout anterior")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-thread", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""
+Benchmark de throughput de lab2 (usuarios) sobre el repository SQLAlchemy async.
+
+Usa una base de datos SQLite temporal y mide:
+
+- Las rutas GET /lab2/usuarios/{id} y POST /lab2/usuarios con un cliente ASGI
+  en proceso (incluye validación y serialización de FastAPI).
+- Las mismas operaciones llamando directamente a UserService (solo repository + pool).
+
+Uso:
+    python -m benchmarks.lab2_users --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JOBS_DB_PATH", ":memory:")
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/bench.sqlite3"
+os.environ.setdefault("AUDIT_DB_PATH", os.path.join(_tmp.name, "audit.sqlite3"))
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(_tmp.name, "audit.jsonl"))
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.labs.lab2.services import get_user_service_instance  # noqa: E402
+from benchmarks.common import print_table, run_load  # noqa: E402
+
+
+async def main(args):
+    rows = []
+    async with app.router.lifespan_context(app):
+        service = get_user_service_instance()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+
+            async def route_create(i: int) -> bool:
+                r = await client.post("/lab2/usuarios", json={"name": f"user{i}", "email": f"user{i}@example.com"})
+                return r.status_code == 200
+
+            async def route_get(i: int) -> bool:
+                r = await client.get(f"/lab2/usuarios/{i % args.requests + 1}")
+                return r.status_code == 200
+
+            async def service_create(i: int) -> bool:
+                await service.create_user(f"svc{i}", f"svc{i}@example.com")
+                return True
+
+            async def service_get(i: int) -> bool:
+                await service.get_user(i % args.requests + 1)
+                return True
+
+            rows.append(("POST /lab2/usuarios", await run_load(route_create, args.requests, args.concurrency)))
+            rows.append(("GET /lab2/usuarios/{id}", await run_load(route_get, args.requests, args.concurrency)))
+            rows.append(("UserService.create_user", await run_load(service_create, args.requests, args.concurrency)))
+            rows.append(("UserService.get_user", await run_load(service_get, args.requests, args.concurrency)))
+
+    print(f"\nSQLite temporal · {args.requests} operaciones · concurrencia {args.concurrency}\n")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
+    _tmp.cleanup()
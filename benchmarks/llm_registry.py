@@ -0,0 +1,49 @@
+"""
+Benchmark: coste por request de preparar el LLM de lab1.
+
+Compara crear ChatGoogleGenerativeAI + with_structured_output + chain en cada
+request (comportamiento anterior) frente a reutilizarlos desde `llm_registry`.
+No hace llamadas de red: solo mide la preparación del cliente.
+
+Uso:
+    python -m benchmarks.llm_registry
+"""
+
+import os
+import time
+
+os.environ.setdefault("GOOGLEAI_API_KEY", "bench-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.llm_client import llm_chain_google, llm_registry  # noqa: E402
+from app.labs.lab1.prompts import intent_prompt  # noqa: E402
+from app.labs.lab1.schemas import P1Response  # noqa: E402
+
+
+def per_request_build():
+    llm = llm_chain_google().with_structured_output(P1Response)
+    return intent_prompt | llm
+
+
+def registry_lookup():
+    llm_registry.get_structured(P1Response)
+    return llm_registry.get_chain(intent_prompt, P1Response)
+
+
+def measure(fn, iterations: int) -> float:
+    """
+    Devuelve el tiempo medio por llamada en microsegundos.
+    """
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    before = measure(per_request_build, 50)
+    after = measure(registry_lookup, 100_000)
+    print(f"Antes  (cliente nuevo por request): {before:12.1f} µs/request")
+    print(f"Después (registro compartido):       {after:12.3f} µs/request")
+    print(f"Mejora: x{before / after:,.0f}")
@@ -0,0 +1,151 @@
+"""
+Benchmark del rate limiter por API key de lab3 (token bucket con locks por shard).
+
+Con K claves distintas (por defecto 100k) mide:
+
+- Coste de `TokenBucketLimiter.hit` por llamada (1 shard vs RATE_LIMIT_SHARDS),
+  en un hilo y con varios hilos a la vez.
+- Sobrecoste por request de la dependencia del router (llamada directa) y
+  latencia de GET /lab3/limit con ella (cliente ASGI en proceso).
+- Memoria de los buckets y barrido de claves inactivas (reloj simulado).
+
+Uso:
+    python -m benchmarks.rate_limit
+    python -m benchmarks.rate_limit --keys 100000 --requests 3000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JOBS_DB_PATH", ":memory:")
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp.name}/bench.sqlite3")
+os.environ.setdefault("AUDIT_DB_PATH", os.path.join(_tmp.name, "audit.sqlite3"))
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(_tmp.name, "audit.jsonl"))
+
+import httpx  # noqa: E402
+from fastapi import HTTPException, Request, Response  # noqa: E402
+from app.main import app  # noqa: E402
+from app.rate_limit import TokenBucketLimiter  # noqa: E402
+from app.labs.lab3.config import config  # noqa: E402
+from app.labs.lab3.dependencies import rate_limit_dependency  # noqa: E402
+from app.labs.lab3.services import ConfigService, rate_limiter  # noqa: E402
+from benchmarks.common import print_table, run_load  # noqa: E402
+
+# Las K claves del benchmark ("key-N") se tratan como API keys válidas de K clientes distintos
+ConfigService.validate_api_key = lambda self: self.api_key.startswith("key-")
+
+
+def bench_hit(shards: int, keys: list[str], calls: int, threads: int) -> float:
+    """
+    ns por llamada a hit() (tiempo total / llamadas, con `threads` hilos en paralelo).
+    """
+    limiter = TokenBucketLimiter(window=60, shards=shards)
+    for key in keys:
+        limiter.hit(key, 100)
+    per_thread = calls // threads
+    samples = [random.Random(t).choices(keys, k=per_thread) for t in range(threads)]
+
+    def worker(sample: list[str]):
+        hit = limiter.hit
+        for key in sample:
+            hit(key, 100)
+
+    workers = [threading.Thread(target=worker, args=(sample,)) for sample in samples]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def bench_eviction(keys: list[str]) -> dict:
+    now = [0.0]
+    tracemalloc.start()
+    limiter = TokenBucketLimiter(window=60, shards=64, idle_ttl=300, clock=lambda: now[0])
+    for key in keys:
+        limiter.hit(key, 100)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    filled = len(limiter)
+    # Pasado idle_ttl solo sigue activa una de cada 10 claves; el barrido ocurre al llegar requests
+    now[0] = 301.0
+    for key in keys[::10]:
+        limiter.hit(key, 100)
+    return {"filled": filled, "bytes_key": used / len(keys), "after_idle": len(limiter)}
+
+
+async def bench_dependency(keys: list[str], calls: int) -> float:
+    """
+    µs por llamada a rate_limit_dependency (lo que añade a cada request, sin FastAPI alrededor).
+    """
+    rng = random.Random(3)
+    services = [ConfigService(key) for key in rng.choices(keys, k=calls)]
+    request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+    start = time.perf_counter()
+    for service in services:
+        dependency = rate_limit_dependency(request, Response(), service)
+        try:
+            await anext(dependency)
+            await dependency.aclose()
+        except HTTPException:
+            pass
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def bench_route(keys: list[str], requests: int, concurrency: int) -> dict:
+    rng = random.Random(7)
+    async with app.router.lifespan_context(app):
+        for key in keys:
+            rate_limiter.hit(key, 100)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def call(i: int) -> bool:
+                r = await client.get("/lab3/limit", headers={"api-key": rng.choice(keys)})
+                return r.status_code in (200, 429)
+
+            # Calentamiento (primeras requests de la app)
+            await run_load(call, requests, concurrency)
+            return await run_load(call, requests, concurrency)
+
+
+def main(args):
+    keys = [f"key-{i}" for i in range(args.keys)]
+    print(f"claves distintas: {args.keys}\n")
+    print(f"{'hit()':<28}{'1 hilo ns':>12}{f'{args.threads} hilos ns':>14}")
+    for shards in (1, config.RATE_LIMIT_SHARDS):
+        single = bench_hit(shards, keys, args.calls, 1)
+        multi = bench_hit(shards, keys, args.calls, args.threads)
+        print(f"{f'{shards} shard(s)':<28}{single:>12.0f}{multi:>14.0f}")
+
+    ev = bench_eviction(keys)
+    print(
+        f"\nbuckets: {ev['filled']} claves, {ev['bytes_key']:.0f} B/clave; "
+        f"tras idle_ttl con 1/10 activas: {ev['after_idle']} claves"
+    )
+
+    overhead = asyncio.run(bench_dependency(keys, args.calls))
+    print(f"rate_limit_dependency: {overhead:.1f} µs por request\n")
+
+    print_table([("GET /lab3/limit", asyncio.run(bench_route(keys, args.requests, args.concurrency)))])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=1_000_000, help="llamadas a hit() por escenario")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    main(parser.parse_args())
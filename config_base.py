@@ -19,3 +19,6 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # === Configuración LLM ===
 GOOGLE_LLM_MODEL = "gemini-2.5-flash"
+
+# Modelo más rápido/barato para peticiones hedged (segunda llamada cuando la principal se retrasa)
+GOOGLE_LLM_HEDGE_MODEL = "gemini-2.5-flash-lite"
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.batching import MicroBatcher
+
+
+def test_cancelled_submit_leaves_the_pending_batch():
+    async def scenario():
+        batches = []
+
+        async def process(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(process, max_batch_size=10, max_wait=0.05)
+        cancelled = asyncio.create_task(batcher.submit(1))
+        kept = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await kept == 4
+        assert batches == [[2]]
+
+    asyncio.run(scenario())
+
+
+def test_last_cancelled_submit_stops_the_timer():
+    async def scenario():
+        async def process(items):
+            raise AssertionError("no debería enviarse ningún lote")
+
+        batcher = MicroBatcher(process, max_batch_size=10, max_wait=0.01)
+        task = asyncio.create_task(batcher.submit(1))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert batcher.stats()["pending"] == 0
+        assert batcher._timer is None
+
+    asyncio.run(scenario())
+
+
+def test_batch_in_flight_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def process(items):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return items
+
+        batcher = MicroBatcher(process, max_batch_size=2, max_wait=10)
+        callers = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await batcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_batch_error_reaches_every_caller():
+    async def scenario():
+        async def process(items):
+            raise RuntimeError("fallo del modelo")
+
+        batcher = MicroBatcher(process, max_batch_size=2, max_wait=10)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    asyncio.run(scenario())
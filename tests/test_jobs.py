@@ -0,0 +1,120 @@
+import asyncio
+import os
+
+from app.jobs import JobQueue
+
+
+async def _wait_status(queue: JobQueue, job_id: str, status: str, timeout: float = 2.0) -> dict:
+    async def poll():
+        while True:
+            job = await queue.get(job_id)
+            if job["status"] == status:
+                return job
+            await asyncio.sleep(0.01)
+
+    return await asyncio.wait_for(poll(), timeout)
+
+
+def test_failed_job_is_retried_with_backoff_until_it_succeeds():
+    async def scenario():
+        queue = JobQueue(db_path=":memory:", workers=1, max_attempts=3, backoff=0.01)
+        attempts = 0
+
+        @queue.handler("flaky")
+        async def flaky(value: int):
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                raise RuntimeError("fallo temporal")
+            return value * 2
+
+        await queue.start()
+        try:
+            job_id = await queue.enqueue("flaky", value=21)
+            return await _wait_status(queue, job_id, "done"), await queue.stats()
+        finally:
+            await queue.close()
+
+    job, stats = asyncio.run(scenario())
+    assert job["result"] == 42 and job["attempts"] == 3
+    assert stats["retried"] == 2 and stats["completed"] == 1
+
+
+def test_job_fails_after_max_attempts():
+    async def scenario():
+        queue = JobQueue(db_path=":memory:", workers=1, max_attempts=2, backoff=0.01)
+
+        @queue.handler("broken")
+        async def broken():
+            raise ValueError("siempre falla")
+
+        await queue.start()
+        try:
+            job_id = await queue.enqueue("broken")
+            return await _wait_status(queue, job_id, "failed")
+        finally:
+            await queue.close()
+
+    job = asyncio.run(scenario())
+    assert job["attempts"] == 2
+    assert job["error"] == "ValueError: siempre falla"
+
+
+def test_running_job_is_recovered_after_restart(tmp_path):
+    db_path = os.path.join(tmp_path, "jobs.sqlite3")
+
+    async def scenario():
+        first = JobQueue(db_path=db_path, workers=1)
+        started = asyncio.Event()
+
+        @first.handler("slow")
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        await first.start()
+        job_id = await first.enqueue("slow")
+        await started.wait()
+        # No termina dentro del drenado: queda 'running' en SQLite
+        await first.close(drain_timeout=0.01)
+
+        second = JobQueue(db_path=db_path, workers=1)
+
+        @second.handler("slow")
+        async def fast():
+            return "ok"
+
+        await second.start()
+        try:
+            return await _wait_status(second, job_id, "done"), await second.stats()
+        finally:
+            await second.close()
+
+    job, stats = asyncio.run(scenario())
+    assert job["result"] == "ok"
+    assert stats["recovered"] == 1
+
+
+def test_sweeper_purges_finished_jobs_after_retention():
+    async def scenario():
+        queue = JobQueue(db_path=":memory:", workers=1, retention=0.05, sweep_interval=0.02)
+
+        @queue.handler("noop")
+        async def noop():
+            return None
+
+        await queue.start()
+        try:
+            job_id = await queue.enqueue("noop")
+            await _wait_status(queue, job_id, "done")
+            for _ in range(100):
+                if await queue.get(job_id) is None:
+                    break
+                await asyncio.sleep(0.01)
+            return await queue.get(job_id), await queue.stats()
+        finally:
+            await queue.close()
+
+    job, stats = asyncio.run(scenario())
+    assert job is None
+    assert stats["swept"] == 1 and stats["by_status"] == {}
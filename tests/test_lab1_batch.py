@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import pytest  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from app.labs.lab1 import services  # noqa: E402
+from app.labs.lab1.schemas import P1Response  # noqa: E402
+
+
+def test_intent_batch_bounds_fan_out_and_reports_item_errors(monkeypatch):
+    inflight = peak = 0
+
+    async def fake_parse(message, route, bulk):
+        nonlocal inflight, peak
+        assert bulk
+        inflight += 1
+        peak = max(peak, inflight)
+        await asyncio.sleep(0.01)
+        inflight -= 1
+        if message == "falla":
+            raise ValueError("sin respuesta")
+        return P1Response(action="other", title=message, due_date=None)
+
+    monkeypatch.setattr(services, "parse_intent_message", fake_parse)
+    messages = [f"m{i}" for i in range(10)] + ["falla"]
+
+    async def collect():
+        return [item async for item in services.iter_intent_batch(messages, max_concurrency=3)]
+
+    items = asyncio.run(collect())
+    assert peak == 3
+    assert sorted(item.index for item in items) == list(range(len(messages)))
+    errors = [item for item in items if item.error]
+    assert [item.index for item in errors] == [10]
+
+
+
+def test_intent_batch_is_rejected_whole_when_the_queue_is_full(monkeypatch):
+    limiter = services.llm_limiters.get("/lab1/query-batch-test")
+    monkeypatch.setattr(limiter, "max_queue", 0)
+    with pytest.raises(HTTPException) as exc:
+        services.admit_intent_batch("/lab1/query-batch-test")
+    assert exc.value.status_code == 429
+    assert "Retry-After" in exc.value.headers
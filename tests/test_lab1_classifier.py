@@ -0,0 +1,27 @@
+import os
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest  # noqa: E402
+
+from app.labs.lab1.classifier import classify_intent  # noqa: E402
+from app.labs.lab1.config import config  # noqa: E402
+
+TODAY = date(2026, 10, 14)
+
+
+@pytest.mark.parametrize("message", [
+    "crea una tarea llamada revisar informe el 15 a las 9",
+    "crea una tarea llamada vacaciones del 1 al 15 de agosto",
+    "crea una tarea llamada llamar al banco mañana a las 10:30",
+])
+def test_unparsed_date_fragments_go_to_the_llm(message):
+    _, confidence = classify_intent(message, TODAY)
+    assert confidence < config.INTENT_FAST_PATH_THRESHOLD
+
+
+def test_simple_message_stays_on_the_fast_path():
+    result, confidence = classify_intent("crea una tarea llamada Preparar informe para mañana", TODAY)
+    assert confidence >= config.INTENT_FAST_PATH_THRESHOLD
+    assert (result.action, result.title, result.due_date) == ("create_task", "Preparar informe", "2026-10-15")
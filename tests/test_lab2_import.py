@@ -0,0 +1,27 @@
+import asyncio
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.labs.lab2.services import parse_import_rows  # noqa: E402
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(chunks, fmt: str) -> list:
+    return [row async for row in parse_import_rows(chunks, fmt)]
+
+
+def test_csv_import_strips_utf8_bom():
+    body = "\ufeffname,email\r\nAna,ana@example.com\r\n".encode()
+    rows = asyncio.run(_collect(_chunks(body), "csv"))
+    assert rows == [(2, {"name": "Ana", "email": "ana@example.com"})]
+
+
+def test_csv_import_strips_bom_split_across_chunks():
+    body = "\ufeffname,email\nAna,ana@example.com\n".encode()
+    rows = asyncio.run(_collect(_chunks(body[:2], body[2:]), "csv"))
+    assert rows == [(2, {"name": "Ana", "email": "ana@example.com"})]
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.limiter import AdaptiveLimiter
+
+
+def test_limit_grows_additively_while_fast_and_used():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=4, target_latency=1.0)
+        for _ in range(20):
+            async with limiter.slot():
+                async with limiter.slot():
+                    pass
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 4
+
+
+def test_limit_backs_off_multiplicatively_on_errors():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", initial_limit=10, backoff=0.5, target_latency=1.0)
+        with pytest.raises(RuntimeError):
+            async with limiter.slot():
+                raise RuntimeError("fallo del proveedor")
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 5
+
+
+def test_full_queue_sheds_with_429_and_retry_after():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", initial_limit=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            async with limiter.slot():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return exc.value, limiter.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert stats["rejected_queue_full"] == 1
+    assert stats["inflight"] == 0 and stats["queued"] == 0
+
+
+def test_wait_times_out_with_503():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", initial_limit=1, max_wait=0.01)
+        async with limiter.slot():
+            with pytest.raises(HTTPException) as exc:
+                async with limiter.slot():
+                    pass
+        return exc.value
+
+    assert asyncio.run(scenario()).status_code == 503
+
+
+def test_bulk_waits_skip_the_queue_bound_and_the_timeout():
+    async def scenario():
+        limiter = AdaptiveLimiter("test", initial_limit=1, max_queue=1, max_wait=0.01)
+        done = 0
+
+        async def bulk_item():
+            nonlocal done
+            async with limiter.slot(wait=True):
+                await asyncio.sleep(0.02)
+                done += 1
+
+        limiter.admit()
+        await asyncio.gather(*(bulk_item() for _ in range(5)))
+        # Las esperas en bloque no llenan la cola de las peticiones normales
+        limiter.admit()
+        return done, limiter.stats()
+
+    done, stats = asyncio.run(scenario())
+    assert done == 5
+    assert stats["rejected_queue_full"] == 0 and stats["rejected_timeout"] == 0
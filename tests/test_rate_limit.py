@@ -0,0 +1,83 @@
+import pytest
+
+from app.rate_limit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_burst_up_to_the_limit_then_reject_with_retry_after():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(window=60, clock=clock)
+    assert all(limiter.hit("key", limit=3)[0] for _ in range(3))
+    allowed, remaining, retry_after = limiter.hit("key", limit=3)
+    assert not allowed
+    assert remaining == pytest.approx(0)
+    # 3 tokens por minuto: uno cada 20 s
+    assert retry_after == pytest.approx(20)
+
+
+def test_bucket_refills_continuously_and_caps_at_the_limit():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(window=60, clock=clock)
+    for _ in range(3):
+        limiter.hit("key", limit=3)
+    clock.now += 20
+    assert limiter.hit("key", limit=3) == (True, pytest.approx(0), 0.0)
+    clock.now += 3600
+    allowed, remaining, _ = limiter.hit("key", limit=3)
+    assert allowed and remaining == pytest.approx(2)
+
+
+def test_keys_have_independent_buckets():
+    limiter = TokenBucketLimiter(window=60, clock=FakeClock())
+    assert limiter.hit("a", limit=1)[0]
+    assert not limiter.hit("a", limit=1)[0]
+    assert limiter.hit("b", limit=1)[0]
+
+
+def test_idle_buckets_are_swept():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(window=60, shards=1, clock=clock)
+    limiter.hit("old", limit=5)
+    clock.now += 61
+    limiter.hit("new", limit=5)
+    assert len(limiter) == 1
+    assert limiter.stats()["evicted"] == 1
+
+
+@pytest.fixture
+def lab3_client(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.labs.lab3 import dependencies
+    from app.labs.lab3.router import router
+
+    limiter = TokenBucketLimiter(window=60, clock=FakeClock())
+    monkeypatch.setattr(dependencies, "rate_limiter", limiter)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app), limiter
+
+
+def test_invalid_keys_share_the_client_ip_bucket(lab3_client):
+    client, limiter = lab3_client
+    for i in range(3):
+        response = client.get("/lab3/limit", headers={"api-key": f"falsa-{i}"})
+        assert response.status_code == 403
+    # Rotar keys falsas no crea buckets nuevos
+    assert len(limiter) == 1
+    assert response.headers["X-RateLimit-Remaining"] == "97"
+
+
+def test_valid_key_gets_rate_limit_headers(lab3_client):
+    client, _ = lab3_client
+    response = client.get("/lab3/limit", headers={"api-key": "clave-secreta"})
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Limit"] == "100"
+    assert response.headers["X-RateLimit-Remaining"] == "99"
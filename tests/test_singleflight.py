@@ -0,0 +1,72 @@
+import asyncio
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        results = await asyncio.gather(*(flight.do("k", fn) for _ in range(5)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["ok"] * 5
+    assert calls == 1
+    assert stats == {"inflight": 0, "leader_calls": 1, "saved_calls": 4}
+
+
+def test_follower_survives_the_leader_cancelling():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("k", fn))
+        follower = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_last_waiter_leaving_cancels_the_call_and_frees_the_key():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        cancelled = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                # Sigue desenrollándose un rato después de la cancelación
+                await asyncio.sleep(0.02)
+                cancelled.set()
+                raise
+            return calls
+
+        leader = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        # Llega mientras la anterior termina de cancelarse: lanza una llamada nueva
+        result = await flight.do("k", fn)
+        await cancelled.wait()
+        return result, flight.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == 2
+    assert stats["inflight"] == 0 and stats["leader_calls"] == 2